@@ -1,11 +1,16 @@
 # auth/screener_capture.py
+from __future__ import annotations
+
 import os, re, json
 from datetime import datetime, timezone
-from typing import List
-from playwright.sync_api import sync_playwright, Page, Frame
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:  # Playwright hanya di-import saat fallback capture (lihat get_screener_results_by_name)
+    from playwright.sync_api import Page, Frame
 
 from auth.stockbit_login import get_bearer_token
 from clients import stockbit  # untuk direct API
+from logic import metrics
 
 SCREENER_URL = "https://stockbit.com/screener"
 EXODUS_HOST = "exodus.stockbit.com"
@@ -81,8 +86,10 @@ def get_screener_results_by_name(
     per_page: int = 2000,
     debug: bool = False,
     debug_dir: str = "data/bandar/raw",
+    raw: bool = False,
 ):
     """
+    raw=True → 'data' dari direct API berupa bytes body apa adanya (parsing di logic.parse_pool).
     1) Coba direct API /screener/results (GET/POST) pakai template_id.
     2) Kalau gagal → buka /screener, cari radio/label di SELURUH frames, klik,
        lalu tunggu response /screener/results (wait_for_response).
@@ -93,9 +100,9 @@ def get_screener_results_by_name(
     # 1) Direct API (paling stabil, tidak perlu klik UI)
     if template_id:
         try:
-            bundle = stockbit.akumulasi_results_any(template_id=template_id, per_page=per_page)
+            bundle = stockbit.akumulasi_results_any(template_id=template_id, per_page=per_page, raw=raw)
             j = bundle.get("data")
-            if isinstance(j, (dict, list)):
+            if isinstance(j, (dict, list)) or (isinstance(j, bytes) and j.lstrip()[:1] in (b"{", b"[")):
                 return {
                     "_source": f"direct_api_template_id={template_id}",
                     "data": j,
@@ -108,9 +115,12 @@ def get_screener_results_by_name(
     if not name:
         name = "akum ihsg"
 
+    from playwright.sync_api import sync_playwright
+
     os.makedirs(debug_dir, exist_ok=True)
 
     with sync_playwright() as pw:
+        metrics.inc("playwright_launches", where="screener")
         browser = pw.chromium.launch(headless=headless)
         context = browser.new_context(locale="id-ID")
         page = context.new_page()
@@ -4,13 +4,22 @@ import os, json, time, base64, threading
 from pathlib import Path
 from typing import Optional
 
+from logic import metrics
+
 TOKEN_PATH = Path(os.environ.get("STOCKBIT_TOKEN_PATH", "token.json"))
+LOGIN_URL = "https://stockbit.com/login"
+EXODUS_HOST = "exodus.stockbit.com"
+LOGIN_TIMEOUT_MS = int(os.environ.get("STOCKBIT_LOGIN_TIMEOUT_MS", "60000"))
 
-# ini harus sudah ada di file kamu:
-# def login_and_capture_token(headless: bool = True) -> str: ...
-# yang mengembalikan string bearer terbaru dan menyimpan ke token.json
+# Playwright (browser) hanya di-import di dalam login_and_capture_token: jalur token-only
+# (bearer masih berlaku di token.json / STOCKBIT_BEARER) tidak pernah memuat stack browser.
 
 _LOCK = threading.Lock()
+_CACHE = {}  # str(TOKEN_PATH) → (token, exp); hindari baca/tulis token.json tiap request
+_NO_BROWSER = None  # alasan bila Playwright/Chromium terbukti tidak ada (jangan coba launch ulang tiap request)
+
+class BrowserUnavailable(RuntimeError):
+    """Login ulang butuh Playwright + Chromium yang tidak terpasang di host ini (mis. job token-only)."""
 
 def _decode_jwt_exp(bearer: str) -> Optional[int]:
     """
@@ -42,25 +51,100 @@ def _write_tokenfile(bearer: str, exp: Optional[int] = None):
     if exp:
         payload["exp"] = exp
     TOKEN_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    _CACHE[str(TOKEN_PATH)] = (bearer, exp)
+
+def token_status():
+    """(token, detik sisa umur) dari token.json / STOCKBIT_BEARER tanpa login; (None, 0) bila tak ada."""
+    tok = _read_tokenfile() or os.environ.get("STOCKBIT_BEARER")
+    if not tok:
+        return None, 0
+    exp = _decode_jwt_exp(tok)
+    return tok, (exp - int(time.time())) if exp else 0
+
+def load_token_if_valid(min_remaining_sec: int = 600) -> Optional[str]:
+    tok, left = token_status()
+    return tok if tok and left > min_remaining_sec else None
+
+def save_token(bearer: str):
+    _write_tokenfile(bearer, _decode_jwt_exp(bearer))
+
+def login_and_capture_token(headless: bool = True, timeout_ms: int = LOGIN_TIMEOUT_MS) -> str:
+    """
+    Login via browser (Playwright) lalu tangkap header Authorization request ke exodus.
+    Menyimpan ke token.json dan mengembalikan bearer baru.
+    """
+    email = os.environ.get("STOCKBIT_EMAIL")
+    password = os.environ.get("STOCKBIT_PASSWORD")
+    if not (email and password):
+        raise RuntimeError("STOCKBIT_EMAIL / STOCKBIT_PASSWORD belum di-set")
+
+    global _NO_BROWSER
+    if _NO_BROWSER:
+        raise BrowserUnavailable(_NO_BROWSER)
+    try:
+        from playwright.sync_api import sync_playwright  # berat; hanya bila benar-benar perlu login
+    except ImportError as e:
+        _NO_BROWSER = f"playwright tidak terpasang ({e})"
+        raise BrowserUnavailable(_NO_BROWSER) from e
+
+    captured = {}
+    def _on_request(req):
+        auth = req.headers.get("authorization") or ""
+        if EXODUS_HOST in (req.url or "") and auth.lower().startswith("bearer "):
+            captured["token"] = auth[7:].strip()
 
-def get_bearer_token(headless: bool = True, min_remaining_sec: int = 600) -> str:
+    with sync_playwright() as pw:
+        metrics.inc("playwright_launches", where="login")
+        try:
+            browser = pw.chromium.launch(headless=headless)
+        except Exception as e:
+            if "Executable doesn't exist" in str(e) or "playwright install" in str(e):
+                _NO_BROWSER = "Chromium belum di-install (python -m playwright install chromium)"
+                raise BrowserUnavailable(_NO_BROWSER) from e
+            raise
+        try:
+            page = browser.new_context(locale="id-ID").new_page()
+            page.on("request", _on_request)
+            page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=timeout_ms)
+            page.fill("input[name='username'], input[type='email'], input#username", email, timeout=timeout_ms)
+            page.fill("input[type='password']", password, timeout=timeout_ms)
+            page.keyboard.press("Enter")
+            end = time.monotonic() + timeout_ms / 1000.0
+            while "token" not in captured and time.monotonic() < end:
+                page.wait_for_timeout(500)
+        finally:
+            browser.close()
+
+    tok = captured.get("token")
+    if not tok:
+        raise RuntimeError("login selesai tapi bearer exodus tidak tertangkap")
+    _write_tokenfile(tok, _decode_jwt_exp(tok))
+    return tok
+
+def get_bearer_token(headless: bool = True, min_remaining_sec: int = 600, force_refresh: bool = False) -> str:
     """
     Ambil bearer yang valid.
-    - Prioritas: token.json
+    - Prioritas: cache di memori → token.json
     - Jika tidak ada, coba dari env STOCKBIT_BEARER (hanya bootstrap)
-    - Cek sisa umur JWT (exp). Jika < min_remaining_sec → refresh
+    - Cek sisa umur JWT (exp). Jika < min_remaining_sec (atau force_refresh) → login ulang
     - Kalau request nanti 401/403, klien akan panggil login_and_capture_token() lagi.
     """
+    key = str(TOKEN_PATH)
+    cached = _CACHE.get(key)
+    if cached and not force_refresh and cached[1] and cached[1] - time.time() > min_remaining_sec:
+        return cached[0]
+
     with _LOCK:
         # 1) dari token.json
         tok = _read_tokenfile()
+        from_file = bool(tok)
 
         # 2) kalau belum ada, bootstrap dari ENV sekali
         if not tok:
             tok = os.environ.get("STOCKBIT_BEARER")
 
         def _should_refresh(token: Optional[str]) -> bool:
-            if not token:
+            if force_refresh or not token:
                 return True
             exp = _decode_jwt_exp(token)
             if not exp:
@@ -71,12 +155,13 @@ def get_bearer_token(headless: bool = True, min_remaining_sec: int = 600) -> str
 
         # 3) refresh kalau perlu
         if _should_refresh(tok):
-            new_tok = login_and_capture_token(headless=headless)
-            exp = _decode_jwt_exp(new_tok)
-            _write_tokenfile(new_tok, exp)
-            return new_tok
+            metrics.inc("token_refreshes", reason="forced" if force_refresh else "expiry")
+            return login_and_capture_token(headless=headless)
 
-        # 4) token cukup panjang umurnya → simpan lagi (agar format konsisten)
+        # 4) token cukup panjang umurnya → simpan (sekali) agar format konsisten
         exp = _decode_jwt_exp(tok)
-        _write_tokenfile(tok, exp)
+        if from_file:
+            _CACHE[key] = (tok, exp)
+        else:
+            _write_tokenfile(tok, exp)
         return tok
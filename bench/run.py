@@ -0,0 +1,253 @@
+"""
+Benchmark end-to-end: parsing, snapshot penuh (lawan runners.mock_stockbit), overhead token.
+
+  python -m bench.run                      # jalankan + bandingkan dengan bench/baseline.json
+  python -m bench.run --only parse         # subset (substring nama)
+  python -m bench.run --update-baseline    # simpan hasil sebagai baseline baru
+  python -m bench.run --only startup       # waktu import dingin tiap entry point runner (-X importtime)
+
+Hasil JSON → bench_output.json (atau --out). Exit code 1 bila ada regresi > ambang.
+
+Perbandingan dengan baseline dinormalisasi lewat workload kalibrasi (Python murni) yang diukur tepat
+sebelum dan sesudah tiap benchmark: mesin/runner yang sedang 1.5x lebih lambat tidak dihitung regresi. Selisih di
+bawah NOISE_FLOOR_MS diabaikan, dan tiap kelompok benchmark punya ambang sendiri (THRESHOLDS).
+"""
+
+import argparse, json, os, platform, statistics, subprocess, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+
+from logic import fixtures
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_THRESHOLD = 0.25  # 25% lebih lambat dari baseline (setelah normalisasi) = regresi
+# ambang per kelompok (prefix nama); microbenchmark < 1 ms dan subprocess/jaringan lebih berisik
+THRESHOLDS = {
+    "parse_market_mover.": 0.5,
+    "headers_token_path": 1.0,
+    "snapshot_run.": 0.5,
+    "startup.": 0.5,
+}
+NOISE_FLOOR_MS = 0.25  # selisih absolut (ms) di bawah ini bukan regresi, berapa pun rasionya
+COMPARE_STAT = "median_ms"
+
+def _stats(times):
+    """Statistik per-op (ms); p95 = nearest-rank dari sampel terurut."""
+    times = sorted(times)
+    med = statistics.median(times)
+    return {
+        "runs": len(times),
+        "median_ms": round(med, 4),
+        "min_ms": round(times[0], 4),
+        "p95_ms": round(times[int(0.95 * (len(times) - 1))], 4),
+        "ops_per_sec": round(1000.0 / med, 1) if med > 0 else None,
+    }
+
+def _time_runs(fn, min_time, min_runs, max_runs):
+    fn()  # warm-up
+    times = []
+    t_end = time.perf_counter() + min_time
+    while len(times) < max_runs and (len(times) < min_runs or time.perf_counter() < t_end):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+def measure(fn, min_time=0.5, min_runs=5, max_runs=1000):
+    """Ulangi fn() sampai min_time detik (min_runs..max_runs kali); return statistik per-op (ms) + kalibrasi."""
+    before = calibrate()
+    stats = _stats(_time_runs(fn, min_time, min_runs, max_runs))
+    return dict(stats, cal_ms=round((before + calibrate()) / 2, 4))
+
+# ================== Kalibrasi ==================
+def _calibration_workload():
+    """Campuran dict/str/sort/json seperti parser di repo ini; input tetap → kerja identik tiap run."""
+    rows = [{"symbol": f"S{i % 900:04d}", "value": (i * 7919) % 100003, "lot": str(i % 5000)}
+            for i in range(4000)]
+    agg = {}
+    for r in rows:
+        cur = agg.setdefault(r["symbol"], {"value": 0, "lot": 0})
+        cur["value"] += r["value"]
+        cur["lot"] += int(r["lot"])
+    json.loads(json.dumps(sorted(agg.items(), key=lambda kv: kv[1]["value"])))
+
+def calibrate():
+    """ms per workload kalibrasi di mesin ini, saat ini (median beberapa ulangan)."""
+    return round(statistics.median(_time_runs(_calibration_workload, 0.15, 7, 50)), 4)
+
+# ================== Parsing ==================
+def bench_parse(results, scale_names=(("realistic", 1), ("10x", 10))):
+    from logic.rolling import parse_market_mover
+    from logic.parsers import extract_rt_list, aggregate_rt
+    import runners.bandar_nightly as bandar
+
+    for label, k in scale_names:
+        mm = fixtures.market_mover(n=100 * k)
+        results[f"parse_market_mover.{label}"] = measure(lambda: parse_market_mover(mm))
+
+        rt = fixtures.running_trade(n=500 * k)
+        results[f"rt_extract_aggregate.{label}"] = measure(lambda: aggregate_rt(extract_rt_list(rt)))
+
+        scr = fixtures.screener(n=2000 * k)
+        results[f"parse_akumulasi.{label}"] = measure(lambda: bandar._parse_akumulasi(scr))
+
+        # _sum_rolling_5d membaca 5 file harian dari DATA_DIR → arahkan ke direktori sementara
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            today = bandar.now_id()
+            for i, ds in enumerate(bandar._date_range_last_n(bandar.bandar_settings().rolling_days, today)):
+                rows = bandar._parse_akumulasi(fixtures.screener(n=900 * k, seed=i))
+                bandar._save_json(tmp / f"{ds}.json", rows)
+            saved = bandar.DATA_DIR
+            bandar.DATA_DIR = tmp
+            try:
+                results[f"sum_rolling_5d.{label}"] = measure(bandar._sum_rolling_5d)
+            finally:
+                bandar.DATA_DIR = saved
+
+# ================== Snapshot & token ==================
+def bench_snapshot(results, profile="ideal", port=0):
+    from runners import mock_stockbit
+    from auth import stockbit_login
+    from clients import stockbit
+    from runners import snap_once
+
+    srv, _ = mock_stockbit.serve(port=port, profile=profile)
+    host, port = srv.server_address
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = (stockbit.BASE_URL, stockbit_login.TOKEN_PATH, os.environ.get("STOCKBIT_BEARER"),
+                 snap_once.tg_send, snap_once.PRICES_DIR)
+        stockbit.BASE_URL = f"http://{host}:{port}"
+        stockbit_login.TOKEN_PATH = Path(tmp) / "token.json"
+        os.environ["STOCKBIT_BEARER"] = mock_stockbit.mint_token()
+        snap_once.tg_send = lambda *a, **kw: None
+        snap_once.PRICES_DIR = Path(tmp) / "prices"
+        try:
+            results["headers_token_path"] = measure(stockbit._headers, min_time=0.3)
+            results[f"snapshot_run.{profile}"] = measure(lambda: snap_once.run(subscribers=[]),
+                                                         min_time=2.0, min_runs=3, max_runs=30)
+        finally:
+            snap_once.flush_prices()  # buffer harga ke tmp, bukan ke data/prices saat exit
+            snap_once.DAY_PRICES.update(day=None, prices={}, dirty=False, next=0.0)
+            stockbit.BASE_URL, stockbit_login.TOKEN_PATH, bearer, snap_once.tg_send, snap_once.PRICES_DIR = saved
+            if bearer is None:
+                os.environ.pop("STOCKBIT_BEARER", None)
+            else:
+                os.environ["STOCKBIT_BEARER"] = bearer
+            srv.shutdown()
+
+# ================== Startup (import dingin) ==================
+ENTRY_POINTS = ("runners.snap_once", "runners.market_loop", "runners.rt_alerts", "runners.live_loop",
+                "runners.refresh_token", "runners.bandar_nightly")
+# tidak boleh ikut termuat saat start (hanya saat login/capture browser atau backtest)
+HEAVY_MODULES = ("playwright", "greenlet", "numpy")
+
+def _importtime(module):
+    """python -X importtime -c 'import module' di proses baru → (ms import kumulatif, modul berat yang termuat)."""
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                       cwd=ROOT, capture_output=True, text=True)
+    if p.returncode:
+        raise RuntimeError(f"import {module} gagal: {p.stderr.strip().splitlines()[-1:]}")
+    total, heavy = 0, set()
+    for line in p.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+        if name == module:
+            total = int(parts[1])
+    return total / 1000.0, heavy
+
+def bench_startup(results, runs=5):
+    for mod in ENTRY_POINTS:
+        cal = calibrate()
+        times, heavy = [], set()
+        for _ in range(runs):
+            ms, h = _importtime(mod)
+            times.append(ms)
+            heavy |= h
+        cal = round((cal + calibrate()) / 2, 4)
+        results[f"startup.{mod.split('.')[-1]}"] = dict(_stats(times), cal_ms=cal, heavy_modules=sorted(heavy))
+        if heavy:
+            print(f"[BENCH] PERINGATAN import {mod} memuat modul berat: {', '.join(sorted(heavy))}")
+
+SUITES = {"parse": bench_parse, "snapshot": bench_snapshot, "startup": bench_startup}
+
+# ================== Baseline ==================
+def threshold_for(name, default=DEFAULT_THRESHOLD):
+    for prefix, t in THRESHOLDS.items():
+        if name.startswith(prefix):
+            return max(t, default)
+    return default
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    List regresi: (nama, baseline_ms, sekarang_ms, rasio ternormalisasi) atas COMPARE_STAT.
+    Baseline diskalakan dengan rasio kalibrasi (sekarang / saat baseline) yang diukur tepat sebelum
+    benchmark yang sama; baseline lama tanpa cal_ms → dibandingkan apa adanya.
+    """
+    regs = []
+    for name, cur in results.items():
+        base = (baseline.get("results") or {}).get(name)
+        if not base or not base.get(COMPARE_STAT) or COMPARE_STAT not in cur:
+            continue
+        b, c = base[COMPARE_STAT], cur[COMPARE_STAT]
+        scale = cur["cal_ms"] / base["cal_ms"] if cur.get("cal_ms") and base.get("cal_ms") else 1.0
+        expected = b * scale
+        if c - expected < NOISE_FLOOR_MS:
+            continue
+        ratio = c / expected
+        if ratio > 1.0 + threshold_for(name, threshold):
+            regs.append((name, b, c, ratio))
+    return regs
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark rtvalue")
+    ap.add_argument("--only", help="jalankan suite/benchmark yang namanya mengandung teks ini")
+    ap.add_argument("--out", default="bench_output.json")
+    ap.add_argument("--baseline", default=str(BASELINE_PATH))
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="ambang default; THRESHOLDS per kelompok tetap berlaku bila lebih longgar")
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args()
+
+    results = {}
+    for name, suite in SUITES.items():
+        if args.only and args.only not in name:
+            continue
+        suite(results)
+
+    report = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for name, r in sorted(results.items()):
+        print(f"  {name:<34} median={r['median_ms']:>10.3f} ms  p95={r['p95_ms']:>10.3f} ms  ops/s={r['ops_per_sec']}")
+
+    if args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[BENCH] baseline diperbarui → {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"[BENCH] baseline {args.baseline} belum ada; jalankan dengan --update-baseline")
+        return 0
+    regs = compare(results, baseline, args.threshold)
+    for name, b, c, ratio in regs:
+        print(f"[BENCH] REGRESI {name}: {COMPARE_STAT} {b:.3f} → {c:.3f} ms (x{ratio:.2f} setelah normalisasi)")
+    if regs:
+        return 1
+    print(f"[BENCH] OK — tidak ada regresi (ambang {args.threshold:.0%}/per kelompok, "
+          f"lantai {NOISE_FLOOR_MS} ms; hasil → {args.out})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,32 @@
 # clients/stockbit.py (helper request dengan auto-refresh saat 401/403)
-import requests, time
+import os, requests, time, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from auth import stockbit_login
 from auth.stockbit_login import get_bearer_token
-from auth.stockbit_login import login_and_capture_token  # pastikan ada
+from logic import metrics
+from logic.config import load_config
+from logic.deadline import request_timeout
+
+# STOCKBIT_BASE_URL=http://127.0.0.1:8765 → arahkan semua endpoint ke runners.mock_stockbit
+BASE_URL = os.environ.get("STOCKBIT_BASE_URL", "https://exodus.stockbit.com").rstrip("/")
+
+class StockbitHTTPError(RuntimeError):
+    """Respons >= 400 dari API Stockbit; status_code untuk keputusan (429 → throttle, 401/403 → auth)."""
+    def __init__(self, status_code, url, body=""):
+        super().__init__(f"GET failed ({status_code}): {url} {body}")
+        self.status_code = status_code
+        self.url = url
+
+def http_status(e):
+    """Status HTTP dari exception StockbitHTTPError (None untuk error lain: timeout, koneksi, parsing)."""
+    return getattr(e, "status_code", None)
+
+def is_throttled(e):
+    return http_status(e) == 429
+
+def _url(path):
+    return f"{BASE_URL}{path}"
 
 def _headers():
     bearer = get_bearer_token()
@@ -14,18 +39,128 @@ def _headers():
         "Connection": "keep-alive",
     }
 
+def _timed_request(method, url, params=None, json=None, timeout=30):
+    """requests.request + histogram latensi & hitungan status per endpoint (path)."""
+    endpoint = urlparse(url).path
+    t0 = time.perf_counter()
+    try:
+        r = requests.request(method, url, params=params, json=json, headers=_headers(), timeout=timeout)
+    except Exception as e:
+        metrics.inc("requests", endpoint=endpoint, status=type(e).__name__)
+        metrics.observe("request_seconds", time.perf_counter() - t0, endpoint=endpoint)
+        raise
+    metrics.inc("requests", endpoint=endpoint, status=str(r.status_code))
+    metrics.observe("request_seconds", time.perf_counter() - t0, endpoint=endpoint)
+    return r
+
+# ================== Hedged request ==================
+# GET ke endpoint ekor-panjang (config hedge.endpoints): bila belum selesai setelah kuantil-q latensi
+# historisnya (histogram request_seconds), kirim duplikat; jawaban pertama yang sehat dipakai.
+_HEDGE_EXEC = None
+_HEDGE_LOCK = threading.Lock()
+
+def _hedge_executor():
+    global _HEDGE_EXEC
+    with _HEDGE_LOCK:
+        if _HEDGE_EXEC is None:
+            _HEDGE_EXEC = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        return _HEDGE_EXEC
+
+def _hedge_delay(method, url):
+    """Detik tunggu sebelum duplikat, atau None (hedging mati / endpoint tak terdaftar / sampel kurang)."""
+    cfg = load_config().get("hedge") or {}
+    if method != "GET" or not cfg.get("enable"):
+        return None
+    endpoint = urlparse(url).path
+    if endpoint.rsplit("/", 1)[-1] not in (cfg.get("endpoints") or ()):
+        return None
+    h = metrics.REGISTRY.hist("request_seconds", endpoint=endpoint)
+    if h is None or h.count < int(cfg.get("min_samples", 20)):
+        return None
+    q = h.quantile(float(cfg.get("quantile", 0.95)))
+    return min(max(q, float(cfg.get("min_delay_sec", 0.2))), float(cfg.get("max_delay_sec", 5.0)))
+
+def _hedged_request(method, url, delay, params=None, json=None, timeout=30):
+    endpoint = urlparse(url).path
+    ex = _hedge_executor()
+    first = ex.submit(_timed_request, method, url, params=params, json=json, timeout=timeout)
+    try:
+        return first.result(timeout=delay)
+    except Exception:
+        if first.done():   # gagal cepat (bukan lambat) → tak perlu duplikat
+            raise
+    metrics.inc("hedged_requests", endpoint=endpoint)
+    second = ex.submit(_timed_request, method, url, params=params, json=json, timeout=timeout)
+    last, err = None, None
+    for f in as_completed((first, second), timeout=timeout):
+        try:
+            r = f.result()
+        except Exception as e:
+            err = e
+            continue
+        if r.status_code < 500 and r.status_code != 429:
+            metrics.inc("hedge_winner", endpoint=endpoint, which="hedge" if f is second else "primary")
+            return r
+        last = r
+    if last is not None:
+        return last
+    raise err
+
+def _send(method, url, params=None, json=None, timeout=30):
+    delay = _hedge_delay(method, url)
+    if delay is None or delay >= timeout:
+        return _timed_request(method, url, params=params, json=json, timeout=timeout)
+    return _hedged_request(method, url, delay, params=params, json=json, timeout=timeout)
+
 def _request_with_refresh(method, url, params=None, json=None, timeout=30):
-    r = requests.request(method, url, params=params, json=json, headers=_headers(), timeout=timeout)
+    # di dalam stage snapshot (logic.deadline) timeout dipangkas ke sisa budget stage
+    timeout = request_timeout(timeout)
+    r = _send(method, url, params=params, json=json, timeout=timeout)
     if r.status_code in (401, 403):
+        metrics.inc("token_refreshes", reason=str(r.status_code))
         # paksa login ulang
         try:
-            login_and_capture_token(headless=True)
+            stockbit_login.login_and_capture_token(headless=True)  # diresolve saat dipakai
             time.sleep(1.0)
+        except stockbit_login.BrowserUnavailable:
+            raise  # tak bisa pulih di host ini → runner berhenti dengan alert, bukan retry tiap poll
         except Exception as e:
             print("[AUTH] hard refresh failed:", e)
         # retry
-        r = requests.request(method, url, params=params, json=json, headers=_headers(), timeout=timeout)
+        r = _send(method, url, params=params, json=json, timeout=request_timeout(timeout))
 
     if r.status_code >= 400:
-        raise RuntimeError(f"GET failed: {url} {r.text}")
+        raise StockbitHTTPError(r.status_code, url, r.text)
     return r
+
+# ================== Endpoint ==================
+# raw=True → bytes body apa adanya (decode/parsing diserahkan ke logic.parse_pool)
+def _body(r, raw):
+    return r.content if raw else r.json()
+
+def _market_mover(mover_type, raw=False):
+    params = {"mover_type": mover_type, "filter_stocks": "FILTER_STOCKS_TYPE_MAIN_BOARD"}
+    return _body(_request_with_refresh("GET", _url("/order-trade/market-mover"), params=params), raw)
+
+def top_gainer(raw=False):
+    return _market_mover("MOVER_TYPE_TOP_GAINER", raw)
+
+def top_value(raw=False):
+    return _market_mover("MOVER_TYPE_TOP_VALUE", raw)
+
+def running_trade(limit=50, raw=False):
+    params = {"sort": "DESC", "limit": limit, "order_by": "RUNNING_TRADE_ORDER_BY_TIME"}
+    return _body(_request_with_refresh("GET", _url("/order-trade/running-trade"), params=params), raw)
+
+def powerbuy(symbol, interval="10m", raw=False):
+    params = {"symbol": symbol, "interval": interval}
+    return _body(_request_with_refresh("GET", _url("/order-trade/powerbuy"), params=params), raw)
+
+def akumulasi_results_any(template_id, per_page=2000, raw=False):
+    """Hasil screener by template: coba GET dulu, lalu POST. Return {'method','data'}."""
+    url = _url("/screener/results")
+    q = {"template_id": template_id, "page": 1, "per_page": per_page}
+    try:
+        return {"method": "GET", "data": _body(_request_with_refresh("GET", url, params=q), raw)}
+    except RuntimeError:
+        return {"method": "POST", "data": _body(_request_with_refresh("POST", url, json=q), raw)}
@@ -0,0 +1,233 @@
+# logic/backtest.py — uji aturan akumulasi bandar (rolling N hari + threshold) vs return harga, tervektorisasi
+"""
+Data:
+  data/bandar/<tanggal>.json  → [{symbol, value}]  (hasil bandar_nightly)
+  data/prices/<tanggal>.json  → {symbol: last}     (dicatat snap_once dari Market Mover)
+
+Semua dimuat sekali ke matriks NumPy (hari bursa × simbol), lalu seluruh grid
+window × kelas hari ini × threshold × top-k × horizon dievaluasi dengan broadcasting/einsum.
+Indeks tanggal = hari bursa logic.trading_calendar: hari tanpa capture tetap dihitung (akumulasi 0).
+
+Aturan yang dikirim bandar_nightly = window 5, kelas 2BA+, threshold -inf, top-k 20.
+
+  python -m logic.backtest --windows 1,3,5,10 --classes all,2BA+ --thresholds -inf,10,20 --topk 0,10,20
+"""
+import argparse, json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from logic.trading_calendar import get_calendar
+
+BANDAR_DIR = Path("data/bandar")
+PRICES_DIR = Path("data/prices")
+
+# filter kelas akumulasi HARI ITU (batas sama dengan bandar_nightly._classify); None = tanpa filter
+CLASS_FILTERS = {"all": None, "2BA+": ("2BA", "3BA"), "3BA": ("3BA",)}
+
+def _dated_files(root):
+    """{tanggal: path} untuk file YYYY-MM-DD.json (rolling_5d/class_history dll dilewati)."""
+    out = {}
+    for p in Path(root).glob("*.json"):
+        s = p.stem
+        if len(s) == 10 and s[4] == "-" and s[7] == "-" and s.replace("-", "").isdigit():
+            out[s] = p
+    return out
+
+def _read(path):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+def load_panel(bandar_dir=BANDAR_DIR, prices_dir=PRICES_DIR):
+    """
+    → (dates, symbols, accum, close); dates = semua hari bursa dari file pertama s/d terakhir
+      accum: float64 (D, N), hari tanpa data = 0 (sama seperti _sum_rolling_5d)
+      close: float64 (D, N), tanpa harga = NaN
+    """
+    acc_files = _dated_files(bandar_dir)
+    px_files = _dated_files(prices_dir)
+    found = set(acc_files) | set(px_files)
+    if not found:
+        return [], [], np.zeros((0, 0)), np.zeros((0, 0))
+    days = get_calendar().trading_days(date.fromisoformat(min(found)), date.fromisoformat(max(found)))
+    dates = [d.isoformat() for d in days]
+    skipped = found - set(dates)
+    if skipped:
+        print(f"[BT] {len(skipped)} file di luar hari bursa dilewati: {', '.join(sorted(skipped)[:5])}")
+    acc_files = {d: p for d, p in acc_files.items() if d not in skipped}
+    px_files = {d: p for d, p in px_files.items() if d not in skipped}
+    acc_raw = {d: _read(p) or [] for d, p in acc_files.items()}
+    px_raw = {d: _read(p) or {} for d, p in px_files.items()}
+
+    syms = set()
+    for rows in acc_raw.values():
+        syms.update(r.get("symbol") for r in rows if isinstance(r, dict) and r.get("symbol"))
+    for m in px_raw.values():
+        syms.update(m)
+    symbols = sorted(syms)
+    col = {s: j for j, s in enumerate(symbols)}
+
+    D, N = len(dates), len(symbols)
+    accum = np.zeros((D, N))
+    close = np.full((D, N), np.nan)
+    for i, d in enumerate(dates):
+        for r in acc_raw.get(d, ()):
+            try:
+                accum[i, col[r["symbol"]]] = float(r["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        for s, v in px_raw.get(d, {}).items():
+            try:
+                v = float(v)
+            except (TypeError, ValueError):
+                continue
+            if v > 0:
+                close[i, col[s]] = v
+    return dates, symbols, accum, close
+
+# ================== Komponen vektor ==================
+def rolling_sums(accum, windows):
+    """(D, N) → (W, D, N): jumlah `w` hari terakhir (termasuk hari ini) via cumsum."""
+    D, N = accum.shape
+    cs = np.vstack([np.zeros((1, N)), np.cumsum(accum, axis=0)])
+    out = np.empty((len(windows), D, N))
+    for k, w in enumerate(windows):
+        lo = np.maximum(np.arange(1, D + 1) - w, 0)
+        out[k] = cs[1:] - cs[lo]
+    return out
+
+def class_masks(accum, classes):
+    """
+    (D, N) → bool (C, D, N): kelas akumulasi hari itu masuk CLASS_FILTERS[c].
+    Tervektorisasi dengan batas bandar_nightly._classify (3BA: v > 30, 2BA: 20 <= v < 30 → v == 30 tak berkelas).
+    """
+    out = np.empty((len(classes),) + accum.shape, dtype=bool)
+    is3 = accum > 30
+    is2 = (accum >= 20) & (accum < 30)
+    for c, name in enumerate(classes):
+        allowed = CLASS_FILTERS[name]
+        if allowed is None:
+            out[c] = True
+        else:
+            out[c] = (is3 if "3BA" in allowed else False) | (is2 if "2BA" in allowed else False)
+    return out
+
+def forward_returns(close, horizons):
+    """(D, N) → (H, D, N): close[d+h]/close[d] - 1; NaN bila salah satu harga tak ada."""
+    D, N = close.shape
+    out = np.full((len(horizons), D, N), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for k, h in enumerate(horizons):
+            if 0 < h < D:
+                out[k, :-h] = close[h:] / close[:-h] - 1.0
+    return out
+
+def rank_desc(x):
+    """Peringkat per baris (0 = terbesar) sepanjang sumbu terakhir."""
+    order = np.argsort(-x, axis=-1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(x.shape[-1]), axis=-1)
+    return ranks
+
+def signal_masks(roll, cls, thresholds, topk):
+    """
+    roll (W, D, N), cls (D, N) → mask bool (W, T, K, D, N):
+      lolos bila kelas hari ini lolos filter DAN rolling >= threshold
+      DAN (k == 0 atau masuk top-k rolling di antara simbol yang lolos kelas — urutan bandar_nightly).
+    """
+    thr = np.asarray(thresholds, dtype=float)[None, :, None, None, None]
+    ranks = rank_desc(np.where(cls, roll, -np.inf))[:, None, None]   # (W, 1, 1, D, N)
+    ks = np.asarray(topk)
+    kcap = np.where(ks > 0, ks, roll.shape[-1])[None, None, :, None, None]
+    return cls & (roll[:, None, None] >= thr) & (ranks < kcap)
+
+def evaluate(accum, close, windows, thresholds, topk=(0,), horizons=(1, 3, 5), classes=("all",)):
+    """
+    Evaluasi seluruh grid (per filter kelas, supaya mask tetap seukuran (W, T, K, D, N)).
+    → dict array berbentuk (W, C, T, K, H):
+      n (jumlah sinyal dengan return valid), mean, hit (porsi return > 0),
+      excess (rata-rata return - rata-rata semua simbol pada hari yang sama).
+    """
+    fwd = forward_returns(close, horizons)                     # (H, D, N)
+    valid = ~np.isnan(fwd)
+    r0 = np.where(valid, fwd, 0.0)
+    n_day = valid.sum(axis=-1)
+    bench = np.divide(r0.sum(axis=-1), n_day, out=np.zeros(n_day.shape), where=n_day > 0)
+    ex0 = np.where(valid, fwd - bench[..., None], 0.0)
+
+    validf, posf = valid.astype(np.float32), (r0 > 0).astype(np.float32)
+
+    roll = rolling_sums(accum, windows)
+    parts = {"n": [], "s": [], "hit": [], "ex": []}
+    for cls in class_masks(accum, classes):
+        mask = signal_masks(roll, cls, thresholds, topk).astype(np.float32)
+        parts["n"].append(np.einsum("wtkdn,hdn->wtkh", mask, validf))
+        parts["s"].append(np.einsum("wtkdn,hdn->wtkh", mask, r0))
+        parts["hit"].append(np.einsum("wtkdn,hdn->wtkh", mask, posf))
+        parts["ex"].append(np.einsum("wtkdn,hdn->wtkh", mask, ex0))
+    n, s, hit, ex = (np.stack(parts[k], axis=1) for k in ("n", "s", "hit", "ex"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {"n": n.astype(int), "mean": s / n, "hit": hit / n, "excess": ex / n}
+
+def to_rows(res, windows, thresholds, topk, horizons, classes=("all",), min_n=1):
+    rows = []
+    for idx in np.ndindex(res["n"].shape):
+        if res["n"][idx] < min_n:
+            continue
+        w, c, t, k, h = idx
+        rows.append({"window": windows[w], "class": classes[c], "threshold": thresholds[t], "topk": topk[k],
+                     "horizon": horizons[h],
+                     "n": int(res["n"][idx]), "mean": float(res["mean"][idx]),
+                     "hit": float(res["hit"][idx]), "excess": float(res["excess"][idx])})
+    rows.sort(key=lambda r: r["excess"], reverse=True)
+    return rows
+
+# ================== CLI ==================
+def _ints(s):
+    return [int(x) for x in s.split(",") if x.strip()]
+
+def _floats(s):
+    return [float(x) for x in s.split(",") if x.strip()]
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest aturan akumulasi bandar")
+    ap.add_argument("--windows", default="1,3,5,10")
+    ap.add_argument("--classes", default="all,2BA+,3BA", help="filter kelas hari ini: " + ",".join(CLASS_FILTERS))
+    ap.add_argument("--thresholds", default="-inf,10,20,30,50,100", help="-inf = tanpa threshold")
+    ap.add_argument("--topk", default="0,10,20", help="0 = tanpa batas top-k")
+    ap.add_argument("--horizons", default="1,3,5")
+    ap.add_argument("--min-n", type=int, default=20, help="abaikan kombinasi dengan sinyal < N")
+    ap.add_argument("--show", type=int, default=25)
+    ap.add_argument("--out", help="simpan semua hasil ke JSON")
+    args = ap.parse_args()
+
+    windows, thresholds = _ints(args.windows), _floats(args.thresholds)
+    topk, horizons = _ints(args.topk), _ints(args.horizons)
+    classes = [c.strip() for c in args.classes.split(",") if c.strip()]
+    bad = [c for c in classes if c not in CLASS_FILTERS]
+    if bad:
+        ap.error(f"kelas tidak dikenal: {', '.join(bad)} (pilihan: {', '.join(CLASS_FILTERS)})")
+    dates, symbols, accum, close = load_panel()
+    if not dates:
+        print("[BT] data kosong (data/bandar, data/prices)")
+        return
+    print(f"[BT] {len(dates)} hari bursa ({dates[0]} → {dates[-1]}) × {len(symbols)} simbol; "
+          f"harga tersedia {int((~np.isnan(close)).sum())} titik")
+
+    res = evaluate(accum, close, windows, thresholds, topk, horizons, classes)
+    rows = to_rows(res, windows, thresholds, topk, horizons, classes, min_n=args.min_n)
+    print(f"[BT] {res['n'].size} kombinasi, {len(rows)} dengan n >= {args.min_n}")
+    print(f"  {'win':>3} {'kelas':>5} {'thr':>6} {'topk':>4} {'h':>2} {'n':>6} {'mean':>8} {'hit':>6} {'excess':>8}")
+    for r in rows[:args.show]:
+        print(f"  {r['window']:>3} {r['class']:>5} {r['threshold']:>6g} {r['topk']:>4} {r['horizon']:>2} {r['n']:>6} "
+              f"{r['mean']:>8.2%} {r['hit']:>6.1%} {r['excess']:>8.2%}")
+    if args.out:
+        Path(args.out).write_text(json.dumps({"dates": [dates[0], dates[-1]], "rows": rows}, indent=2),
+                                  encoding="utf-8")
+        print(f"[BT] hasil → {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# logic/bounded.py — state runner yang ukurannya dibatasi (LRU/TTL), reset per sesi, guard memori
+import gc, os
+from collections import OrderedDict
+
+from logic import metrics
+from logic.clock import get_clock
+from logic.trading_calendar import get_calendar
+
+def _monotonic():
+    # lewat get_clock() tiap panggilan: VirtualClock replay (set_clock) ikut dipakai walau objek dibuat lebih dulu
+    return get_clock().monotonic()
+
+_MISSING = object()
+
+class BoundedDict:
+    """
+    Map dengan kapasitas maksimum (LRU: entri paling lama tak disentuh dibuang)
+    dan TTL opsional per entri (detik sejak terakhir di-set).
+    """
+    def __init__(self, maxlen, ttl=None, name="state", clock=_monotonic):
+        self.maxlen = int(maxlen)
+        self.ttl = ttl
+        self.name = name
+        self._clock = clock
+        self._d = OrderedDict()  # key -> (value, t_set)
+
+    def __len__(self):
+        return len(self._d)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def __setitem__(self, key, value):
+        self._d[key] = (value, self._clock())
+        self._d.move_to_end(key)
+        while len(self._d) > self.maxlen:
+            self._d.popitem(last=False)
+            metrics.inc("state_evictions", state=self.name, reason="lru")
+
+    def get(self, key, default=None):
+        item = self._d.get(key)
+        if item is None:
+            return default
+        if self.ttl is not None and self._clock() - item[1] > self.ttl:
+            del self._d[key]
+            metrics.inc("state_evictions", state=self.name, reason="ttl")
+            return default
+        self._d.move_to_end(key)
+        return item[0]
+
+    def pop(self, key, default=None):
+        item = self._d.pop(key, None)
+        return default if item is None else item[0]
+
+    def items(self):
+        return [(k, v) for k, (v, _) in self._d.items()]
+
+    def clear(self):
+        self._d.clear()
+
+    def dump(self):
+        """[(key, value)] urut LRU (tertua dulu) — untuk logic.checkpoint."""
+        return self.items()
+
+    def load(self, items):
+        """Isi ulang dari dump(); umur TTL dihitung ulang dari sekarang."""
+        self._d.clear()
+        for k, v in items:
+            self[k] = v
+
+    def compact(self, keep_ratio=1.0):
+        """Buang entri kedaluwarsa; keep_ratio < 1 → pangkas juga ke porsi LRU terbaru."""
+        if self.ttl is not None:
+            now = self._clock()
+            for k in [k for k, (_, t) in self._d.items() if now - t > self.ttl]:
+                del self._d[k]
+        target = int(self.maxlen * keep_ratio)
+        while len(self._d) > target:
+            self._d.popitem(last=False)
+        return len(self._d)
+
+class SessionState:
+    """
+    Registry state runner. Objek terdaftar (punya .clear()) di-reset saat batas
+    hari ('day') atau sesi ('session': sesi 1 → sesi 2) terlewati.
+    """
+    def __init__(self):
+        self._items = []  # (name, obj, scope)
+        self._key = None
+
+    def register(self, name, obj, scope="day"):
+        self._items.append((name, obj, scope))
+        return obj
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @staticmethod
+    def session_key(now):
+        cal = get_calendar()
+        phase = cal.phase_at(now) or ""
+        return now.date(), ("s2" if phase in ("session2", "preclose", "post") else "s1")
+
+    def check(self, now):
+        """Panggil tiap iterasi; reset state yang scope-nya berganti. Return list nama yang di-reset."""
+        key = self.session_key(now)
+        prev, self._key = self._key, key
+        if prev is None or prev == key:
+            return []
+        day_changed = prev[0] != key[0]
+        reset = []
+        for name, obj, scope in self._items:
+            if day_changed or scope == "session":
+                obj.clear()
+                reset.append(name)
+        if reset:
+            print(f"[STATE] reset {', '.join(reset)} ({prev} → {key})")
+        return reset
+
+    def compact(self, keep_ratio=1.0):
+        for _, obj, _ in self._items:
+            if hasattr(obj, "compact"):
+                obj.compact(keep_ratio)
+
+def rss_mb():
+    """RSS proses saat ini (MB). Linux: /proc/self/statm; lainnya: puncak dari getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+class MemoryGuard:
+    """
+    Cek RSS tiap `every_sec`. Di atas soft_mb → compact (TTL + pangkas ke 50%) + gc.
+    Di atas hard_mb → kosongkan semua state terdaftar.
+    """
+    def __init__(self, state, soft_mb=None, hard_mb=None, every_sec=None, clock=_monotonic):
+        env = os.environ.get
+        self.state = state
+        self.soft_mb = float(soft_mb or env("MEM_SOFT_MB") or 300)
+        self.hard_mb = float(hard_mb or env("MEM_HARD_MB") or 450)
+        self.every_sec = float(every_sec or env("MEM_CHECK_SEC") or 60)
+        self._clock = clock
+        self._next = 0.0
+
+    def check(self):
+        now = self._clock()
+        if now < self._next:
+            return None
+        self._next = now + self.every_sec
+        rss = rss_mb()
+        metrics.set_gauge("rss_mb", round(rss, 1))
+        if rss < self.soft_mb:
+            return rss
+        level = "hard" if rss >= self.hard_mb else "soft"
+        sizes = {name: len(obj) for name, obj, _ in self.state if hasattr(obj, "__len__")}
+        if level == "hard":
+            for _, obj, _ in self.state:
+                obj.clear()
+        else:
+            self.state.compact(keep_ratio=0.5)
+        gc.collect()
+        after = rss_mb()
+        metrics.inc("mem_compactions", level=level)
+        print(f"[MEM] RSS {rss:.0f}MB ≥ {level} ({self.soft_mb:.0f}/{self.hard_mb:.0f}MB) → "
+              f"{'clear' if level == 'hard' else 'compact'} {sizes}; sekarang {after:.0f}MB")
+        return after
@@ -0,0 +1,116 @@
+# logic/cadence.py — interval polling adaptif per endpoint
+from logic.config import load_config, aggressive_window, config_version
+
+DEFAULTS = {
+    "snapshot":      {"min_sec": 120, "max_sec": 600, "busy_trades_per_sec": 60},
+    "running_trade": {"min_sec": 2,   "max_sec": 15},  # min = poll tetap lama (2 detik); jangan lebih rapat
+}
+
+def _ewma(prev, x, alpha):
+    return x if prev is None else (alpha * x + (1 - alpha) * prev)
+
+def rank_churn(prev, cur):
+    """Porsi posisi Top-N yang berubah simbol (0 = identik, 1 = semua berubah)."""
+    if not prev or not cur:
+        return 0.0
+    n = max(len(prev), len(cur))
+    same = sum(1 for a, b in zip(prev, cur) if a == b)
+    return 1.0 - same / n
+
+class AdaptiveCadence:
+    """
+    Interval = min_sec..max_sec (skala log) dari skor aktivitas 0..1:
+      - laju trade baru (per detik) relatif terhadap busy_trades_per_sec
+      - churn ranking Top Gainer relatif terhadap busy_churn
+    Error/throttle memperlambat (backoff), dan di aggressive_window interval = min_sec.
+    """
+    def __init__(self, name, min_sec, max_sec, busy_trades_per_sec=20.0, busy_churn=0.3,
+                 window=None, alpha=0.3):
+        self.name = name
+        self.min_sec = float(min_sec)
+        self.max_sec = float(max_sec)
+        self.busy_rate = float(busy_trades_per_sec)
+        self.busy_churn = float(busy_churn)
+        self.window = window
+        self.alpha = alpha
+        self.trade_rate = None
+        self.churn = None
+        self.err_rate = None
+        self.throttle = 0  # 429 beruntun
+        self._cfg_version = None  # diisi get_cadence → ikut config.yaml yang di-reload
+
+    # ---------- sinyal ----------
+    def observe_trades(self, n_new, elapsed_sec):
+        if elapsed_sec > 0:
+            self.trade_rate = _ewma(self.trade_rate, n_new / elapsed_sec, self.alpha)
+
+    def observe_ranks(self, prev_symbols, cur_symbols):
+        if not prev_symbols:  # belum ada pembanding → jangan isi EWMA dengan 0 (bias ke sepi)
+            return None
+        c = rank_churn(prev_symbols, cur_symbols)
+        self.churn = _ewma(self.churn, c, self.alpha)
+        return c
+
+    def observe_result(self, ok=True, throttled=False):
+        self.err_rate = _ewma(self.err_rate, 0.0 if ok else 1.0, self.alpha)
+        self.throttle = self.throttle + 1 if throttled else 0
+
+    # ---------- checkpoint (logic.checkpoint) ----------
+    def dump_state(self):
+        return {"trade_rate": self.trade_rate, "churn": self.churn,
+                "err_rate": self.err_rate, "throttle": self.throttle}
+
+    def load_state(self, d):
+        for k in ("trade_rate", "churn", "err_rate", "throttle"):
+            if k in d:
+                setattr(self, k, d[k])
+
+    # ---------- keputusan ----------
+    def activity(self):
+        a = 0.0
+        if self.trade_rate is not None:
+            a = max(a, min(1.0, self.trade_rate / self.busy_rate))
+        if self.churn is not None:
+            a = max(a, min(1.0, self.churn / self.busy_churn))
+        return a
+
+    def in_window(self, now):
+        if not self.window:
+            return False
+        s, e = self.window
+        return s <= now.time() < e
+
+    def _sync_config(self):
+        if self._cfg_version is None:
+            return
+        v = config_version()
+        if v != self._cfg_version:
+            self._cfg_version = v
+            p = _params(self.name, load_config())
+            self.min_sec, self.max_sec = float(p["min_sec"]), float(p["max_sec"])
+            self.busy_rate = float(p.get("busy_trades_per_sec", self.busy_rate))
+            self.busy_churn = float(p.get("busy_churn", self.busy_churn))
+            self.window = aggressive_window()
+
+    def next_interval(self, now):
+        self._sync_config()
+        a = 1.0 if self.in_window(now) else self.activity()
+        iv = self.min_sec * (self.max_sec / self.min_sec) ** (1.0 - a)
+        if self.err_rate:
+            iv *= 1.0 + 3.0 * self.err_rate
+        if self.throttle:
+            iv *= 2 ** min(self.throttle, 5)
+            return min(iv, self.max_sec * 4)  # throttled boleh melewati max
+        return min(max(iv, self.min_sec), self.max_sec)
+
+def _params(name, cfg):
+    c = dict(DEFAULTS.get(name, {"min_sec": 2, "max_sec": 60}))
+    c.update((cfg.get("cadence") or {}).get(name) or {})
+    return c
+
+def get_cadence(name, cfg=None):
+    """cfg None → ikut config.yaml, termasuk perubahan saat loop berjalan."""
+    cad = AdaptiveCadence(name, window=aggressive_window(cfg), **_params(name, cfg if cfg is not None else load_config()))
+    if cfg is None:
+        cad._cfg_version = config_version()
+    return cad
@@ -0,0 +1,130 @@
+# logic/checkpoint.py — checkpoint atomik state intraday runner (warm restart dalam sesi yang sama)
+# Isi = JSON (bukan pickle): file ikut cache Actions, jadi restore tidak boleh bisa mengeksekusi kode.
+# Jangan daftarkan rahasia (bearer dll.) — token.json / secret sudah menanganinya.
+import os, json, struct, time, zlib
+from pathlib import Path
+
+from logic import metrics
+from logic.clock import get_clock
+from logic.trading_calendar import get_calendar
+
+CHECKPOINT_DIR = Path(os.environ.get("CHECKPOINT_DIR", "data/checkpoint"))
+CHECKPOINT_EVERY = float(os.environ.get("CHECKPOINT_EVERY_SEC", "30"))
+
+MAGIC = b"RTCKPT02"
+# header: magic, sesi (YYYYMMDD hari bursa), waktu simpan (epoch clock), crc32 payload
+_HDR = struct.Struct("<8sIdI")
+
+def session_id(now):
+    return int(now.strftime("%Y%m%d"))
+
+class Checkpoint:
+    """
+    Satu file per runner: <CHECKPOINT_DIR>/<name>.bin = header + zlib(json({key: state})).
+    dump() harus mengembalikan nilai yang bisa di-JSON-kan (tuple → list; load() yang mengembalikannya).
+    Penyedia state didaftarkan dengan register(key, dump, load); save() ditulis atomik
+    (tmp + fsync + rename), restore() hanya memuat checkpoint milik sesi bursa yang sedang berjalan.
+    """
+    def __init__(self, name, path=None, every_sec=CHECKPOINT_EVERY):
+        self.name = name
+        self.path = Path(path or CHECKPOINT_DIR / f"{name}.bin")
+        self.every_sec = float(every_sec)
+        self.saved_at = None   # epoch checkpoint terakhir yang dipulihkan/disimpan
+        self._providers = {}
+        self._next = 0.0
+
+    def register(self, key, dump, load):
+        self._providers[key] = (dump, load)
+
+    # ---------- simpan ----------
+    def save(self, now=None):
+        now = now or get_clock().now()
+        t0 = time.perf_counter()
+        state = {}
+        for key, (dump, _) in self._providers.items():
+            try:
+                state[key] = dump()
+            except Exception as e:
+                print(f"[CKPT] {self.name}: dump {key} gagal: {e}")
+        payload = zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"), 3)
+        hdr = _HDR.pack(MAGIC, session_id(now), now.timestamp(), zlib.crc32(payload))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(hdr)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.saved_at = now.timestamp()
+        metrics.observe("checkpoint_seconds", time.perf_counter() - t0, runner=self.name)
+        metrics.set_gauge("checkpoint_bytes", _HDR.size + len(payload), runner=self.name)
+        return self.path
+
+    def maybe_save(self, now=None, force=False):
+        """save() paling sering tiap every_sec (untuk dipanggil tiap iterasi loop); error hanya dicetak."""
+        t = time.monotonic()
+        if t < self._next and not force:
+            return None
+        self._next = t + self.every_sec
+        try:
+            return self.save(now)
+        except Exception as e:
+            print(f"[CKPT] {self.name}: simpan gagal: {e}")
+            return None
+
+    # ---------- pulihkan ----------
+    def _read(self):
+        raw = self.path.read_bytes()
+        magic, sess, saved_at, crc = _HDR.unpack_from(raw, 0)
+        payload = raw[_HDR.size:]
+        if magic != MAGIC or zlib.crc32(payload) != crc:
+            raise ValueError("header/crc tidak cocok")
+        return sess, saved_at, payload
+
+    def restore(self, now=None):
+        """Muat checkpoint bila milik sesi bursa saat ini. Return list key yang dipulihkan."""
+        now = now or get_clock().now()
+        t0 = time.perf_counter()
+        try:
+            sess, saved_at, payload = self._read()
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"[CKPT] {self.name}: checkpoint rusak ({e}); mulai dari nol")
+            return []
+        cal = get_calendar()
+        end = cal.day_end(now.date())
+        if sess != session_id(now) or end is None or now >= end or saved_at > now.timestamp():
+            print(f"[CKPT] {self.name}: checkpoint sesi {sess} bukan sesi berjalan; diabaikan")
+            return []
+        try:
+            state = json.loads(zlib.decompress(payload))
+        except Exception as e:
+            print(f"[CKPT] {self.name}: isi checkpoint tidak valid ({e}); mulai dari nol")
+            return []
+        if not isinstance(state, dict):
+            print(f"[CKPT] {self.name}: isi checkpoint tidak valid; mulai dari nol")
+            return []
+        restored = []
+        for key, value in state.items():
+            prov = self._providers.get(key)
+            if prov is None:
+                continue
+            try:
+                prov[1](value)
+                restored.append(key)
+            except Exception as e:
+                print(f"[CKPT] {self.name}: load {key} gagal: {e}")
+        self.saved_at = saved_at
+        ms = (time.perf_counter() - t0) * 1000.0
+        metrics.observe("checkpoint_restore_seconds", ms / 1000.0, runner=self.name)
+        print(f"[CKPT] {self.name}: dipulihkan {', '.join(restored) or '-'} "
+              f"(umur {now.timestamp() - saved_at:.0f}s, {ms:.1f} ms)")
+        return restored
+
+    def age(self, now=None):
+        """Detik sejak checkpoint terakhir (None bila belum ada)."""
+        if self.saved_at is None:
+            return None
+        return (now or get_clock().now()).timestamp() - self.saved_at
@@ -0,0 +1,123 @@
+# logic/class_history.py — riwayat klasifikasi bandar per simbol + indeks transisi & streak
+import json
+from datetime import date as _date
+from pathlib import Path
+
+from logic.trading_calendar import get_calendar
+
+ACCUM = ("2BA", "3BA")
+DISTRIB = ("1BD", "2BD", "3BD")
+KEEP_DAYS = 60  # hari transisi yang disimpan
+
+class ClassHistory:
+    """
+    State (satu file JSON, diperbarui inkremental tiap malam):
+      symbols:      {sym: {cls, prev, since, streak, acc_streak}}
+      transitions:  {date: {"PREV>CLS": [sym, ...]}}   ← query "baru masuk X" = O(hasil)
+      acc_streaks:  {n: [sym, ...]}                     ← query "streak 2BA+ >= n" = O(hasil)
+    Streak dihitung per hari BURSA (logic.trading_calendar): hari bursa tanpa capture memutus streak.
+    """
+    def __init__(self, path: Path, calendar=None):
+        self.path = Path(path)
+        self.cal = calendar or get_calendar()
+        self.last_date = None
+        self.symbols = {}
+        self.transitions = {}
+        self.acc_streaks = {}
+        self._load()
+
+    def _load(self):
+        try:
+            d = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        self.last_date = d.get("last_date")
+        self.symbols = d.get("symbols") or {}
+        self.transitions = d.get("transitions") or {}
+        self.acc_streaks = {int(k): v for k, v in (d.get("acc_streaks") or {}).items()}
+
+    def save(self):
+        obj = {"last_date": self.last_date, "symbols": self.symbols,
+               "transitions": self.transitions, "acc_streaks": self.acc_streaks}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(obj, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.path)
+
+    # ---------- update ----------
+    def update(self, date, labels):
+        """
+        labels: {sym: kelas hari ini} (simbol yang tidak ada → 'nan').
+        Idempoten per tanggal: tanggal <= last_date dilewati. Return False bila dilewati.
+        """
+        if self.last_date and date <= self.last_date:
+            return False
+        # hari bursa terlewat (capture gagal/libur data) → kelas di hari itu tak diketahui, streak mulai ulang
+        gap = self.cal.trading_days_between(_date.fromisoformat(self.last_date),
+                                            _date.fromisoformat(date)) if self.last_date else 0
+        if gap:
+            print(f"[HIST] {gap} hari bursa tanpa data sebelum {date}; streak dimulai ulang")
+        trans = {}
+        for sym in set(self.symbols) | set(labels):
+            cls = labels.get(sym, "nan")
+            st = self.symbols.get(sym)
+            prev = st["cls"] if st else "nan"
+            if cls == "nan" and prev == "nan":
+                self.symbols.pop(sym, None)  # simbol hilang 2 hari beruntun → buang
+                continue
+            if st is None:
+                st = self.symbols[sym] = {"cls": "nan", "prev": "nan", "since": date, "streak": 0, "acc_streak": 0}
+            if cls != prev:
+                trans.setdefault(f"{prev}>{cls}", []).append(sym)
+                st["prev"], st["since"], st["streak"] = prev, date, 1
+            elif gap:
+                st["since"], st["streak"] = date, 1
+            else:
+                st["streak"] += 1
+            if cls not in ACCUM:
+                st["acc_streak"] = 0
+            else:
+                st["acc_streak"] = 1 if gap else st["acc_streak"] + 1
+            st["cls"] = cls
+
+        for v in trans.values():
+            v.sort()
+        self.transitions[date] = trans
+        for old in sorted(self.transitions)[:-KEEP_DAYS]:
+            del self.transitions[old]
+
+        streaks = {}
+        for sym, st in self.symbols.items():
+            if st["acc_streak"]:
+                streaks.setdefault(st["acc_streak"], []).append(sym)
+        self.acc_streaks = {n: sorted(v) for n, v in streaks.items()}
+        self.last_date = date
+        return True
+
+    # ---------- query ----------
+    def entered(self, date, to_classes, from_classes=None):
+        """Simbol yang BERPINDAH ke to_classes pada tanggal itu (opsional: hanya dari from_classes)."""
+        out = []
+        for key, syms in (self.transitions.get(date) or {}).items():
+            prev, cls = key.split(">", 1)
+            if cls in to_classes and prev not in to_classes and (from_classes is None or prev in from_classes):
+                out.extend(syms)
+        return sorted(out)
+
+    def new_3ba(self, date):
+        return self.entered(date, ("3BA",))
+
+    def new_accumulation(self, date):
+        """Baru masuk 2BA/3BA (dari kelas apa pun selain 2BA/3BA)."""
+        return self.entered(date, ACCUM)
+
+    def flipped_to_distribution(self, date, from_classes=ACCUM + ("1BA", "NA")):
+        return self.entered(date, DISTRIB, from_classes=from_classes)
+
+    def acc_streak_at_least(self, n):
+        """[(sym, streak)] dengan streak 2BA+ >= n, streak terpanjang dulu."""
+        out = [(s, k) for k, syms in self.acc_streaks.items() if k >= n for s in syms]
+        out.sort(key=lambda x: (-x[1], x[0]))
+        return out
+
+    def state(self, sym):
+        return self.symbols.get(sym)
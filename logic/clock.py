@@ -0,0 +1,60 @@
+# logic/clock.py — sumber waktu yang bisa diganti (wall clock / virtual untuk replay)
+import time
+from datetime import datetime, timedelta
+from logic.trading_calendar import TZ, _to_local
+
+class SystemClock:
+    def now(self):
+        return datetime.now(TZ)
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, sec):
+        if sec > 0:
+            time.sleep(sec)
+
+class VirtualClock:
+    """
+    Waktu virtual untuk replay:
+      - sleep(sec) memajukan waktu virtual seketika (speed=None) atau sambil tidur nyata sec/speed
+      - kerja sungguhan (parsing, render) tetap terhitung: waktu nyata sejak start ikut ditambahkan
+      - advance(sec) menambah waktu virtual tanpa tidur (mis. latensi API simulasi)
+    """
+    def __init__(self, start, speed=None):
+        self._start = _to_local(start)
+        self._real0 = time.monotonic()
+        self._jumped = 0.0
+        self.speed = speed
+
+    def _elapsed(self):
+        return (time.monotonic() - self._real0) + self._jumped
+
+    def now(self):
+        return self._start + timedelta(seconds=self._elapsed())
+
+    def monotonic(self):
+        return self._elapsed()
+
+    def sleep(self, sec):
+        if sec <= 0:
+            return
+        if self.speed:
+            time.sleep(sec / self.speed)
+            self._jumped += sec - sec / self.speed  # bagian nyata sudah terhitung di _elapsed
+        else:
+            self._jumped += sec
+
+    def advance(self, sec):
+        self._jumped += max(0.0, sec)
+
+_CLOCK = SystemClock()
+
+def get_clock():
+    return _CLOCK
+
+def set_clock(clock):
+    """Ganti sumber waktu global (replay/test); kembalikan clock sebelumnya."""
+    global _CLOCK
+    prev, _CLOCK = _CLOCK, clock
+    return prev
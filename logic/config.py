@@ -0,0 +1,198 @@
+# logic/config.py — baca config.yaml (di-cache, dimuat ulang otomatis bila file berubah)
+import os, time
+from datetime import time as dtime
+from pathlib import Path
+from typing import NamedTuple
+import yaml
+
+CONFIG_PATH = Path(os.environ.get("RTVALUE_CONFIG", "config.yaml"))
+RELOAD_CHECK_SEC = float(os.environ.get("RTVALUE_CONFIG_CHECK_SEC", "2"))  # jeda minimum antar stat()
+
+_CACHE = None
+_MTIME = None
+_CHECKED = 0.0
+_VERSION = 0
+
+def load_config(path: Path = CONFIG_PATH, force=False):
+    """
+    dict config.yaml. Dipanggil tiap iterasi pun murah: file hanya di-stat tiap RELOAD_CHECK_SEC
+    dan di-parse ulang bila mtime berubah. YAML rusak saat reload → versi lama tetap dipakai.
+    """
+    global _CACHE, _MTIME, _CHECKED, _VERSION
+    now = time.monotonic()
+    if _CACHE is not None and not force and now - _CHECKED < RELOAD_CHECK_SEC:
+        return _CACHE
+    _CHECKED = now
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _CACHE is not None and mtime == _MTIME:
+        return _CACHE
+
+    try:
+        cfg = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        if not isinstance(cfg, dict):
+            raise ValueError("isi bukan mapping")
+    except FileNotFoundError:
+        print(f"[CONFIG] {path} tidak ada; pakai default.")
+        cfg = {}
+    except Exception as e:
+        _MTIME = mtime  # jangan parse ulang file rusak yang sama terus-menerus
+        if _CACHE is not None:
+            print(f"[CONFIG] reload {path} gagal ({e}); tetap pakai versi sebelumnya.")
+            return _CACHE
+        print(f"[CONFIG] {path} tidak valid ({e}); pakai default.")
+        cfg = {}
+
+    if _CACHE is not None:
+        print(f"[CONFIG] {path} berubah → dimuat ulang")
+    _CACHE, _MTIME = cfg, mtime
+    _VERSION += 1
+    return _CACHE
+
+def config_version():
+    """Naik setiap kali config dimuat (ulang); berguna untuk cache turunan."""
+    load_config()
+    return _VERSION
+
+def parse_hhmm(s):
+    """'09:00' / '0900' → datetime.time."""
+    s = str(s).replace(":", "").strip().zfill(4)
+    return dtime(int(s[:2]), int(s[2:4]))
+
+def aggressive_window(cfg=None):
+    """(start, end) datetime.time dari blok aggressive_window, atau None."""
+    w = (cfg if cfg is not None else load_config()).get("aggressive_window") or {}
+    if not (w.get("start_hhmm") and w.get("end_hhmm")):
+        return None
+    return parse_hhmm(w["start_hhmm"]), parse_hhmm(w["end_hhmm"])
+
+# ================== Ukuran fetch (typed, per jendela waktu) ==================
+class FetchSettings(NamedTuple):
+    top_n: int = 10                 # report.top_n
+    include_powerbuy: bool = True   # report.include_powerbuy
+    value_pool: int = 50            # report.value_pool — bahan Top Value sebelum filter naik
+    rt_limit: int = 500             # running_trade.limit — tape untuk agregasi snapshot
+    rt_poll_limit: int = 100        # running_trade.poll_limit — per poll rt_alerts
+    pb_limit: int = 20              # powerbuy.per_report_limit — fan-out simbol per laporan
+    pb_interval: str = "10m"        # powerbuy.interval
+    pb_workers: int = 1             # powerbuy.workers — request PowerBuy paralel
+
+# field → (blok yaml, kunci)
+_FIELDS = {
+    "top_n":            ("report", "top_n"),
+    "include_powerbuy": ("report", "include_powerbuy"),
+    "value_pool":       ("report", "value_pool"),
+    "rt_limit":         ("running_trade", "limit"),
+    "rt_poll_limit":    ("running_trade", "poll_limit"),
+    "pb_limit":         ("powerbuy", "per_report_limit"),
+    "pb_interval":      ("powerbuy", "interval"),
+    "pb_workers":       ("powerbuy", "workers"),
+}
+
+def _coerce(typ, v):
+    if typ is bool:
+        if isinstance(v, str):
+            return v.strip().lower() in ("1", "true", "yes", "on")
+        return bool(v)
+    v = typ(v)
+    if typ is int and v < 0:
+        raise ValueError("negatif")
+    return v
+
+def _window_overrides(cfg, t):
+    """
+    Override yang berlaku pada jam t, urut (yang belakangan menimpa):
+      aggressive_window.overrides, lalu tiap entri windows: [{start_hhmm, end_hhmm, overrides}].
+    """
+    out = []
+    wins = [cfg.get("aggressive_window") or {}] + list(cfg.get("windows") or [])
+    for w in wins:
+        if not isinstance(w, dict) or not w.get("overrides"):
+            continue
+        try:
+            s, e = parse_hhmm(w["start_hhmm"]), parse_hhmm(w["end_hhmm"])
+        except Exception:
+            continue
+        if s <= t < e:
+            out.append(w["overrides"])
+    return out
+
+def _build_settings(cfg, t):
+    layers = [cfg] + _window_overrides(cfg, t)
+    vals = {}
+    for name, (block, key) in _FIELDS.items():
+        typ = FetchSettings.__annotations__[name]
+        for layer in layers:
+            v = (layer.get(block) or {}).get(key)
+            if v is None:
+                continue
+            try:
+                vals[name] = _coerce(typ, v)
+            except (TypeError, ValueError):
+                print(f"[CONFIG] {block}.{key}={v!r} tidak valid; diabaikan")
+    return FetchSettings(**vals)
+
+_SETTINGS = {}
+
+def fetch_settings(now=None):
+    """FetchSettings untuk saat `now` (default: jam clock sekarang), mengikuti config terbaru."""
+    if now is None:
+        from logic.clock import get_clock
+        now = get_clock().now()
+    cfg = load_config()
+    t = now.time().replace(second=0, microsecond=0)
+    key = (_VERSION, t)
+    s = _SETTINGS.get(key)
+    if s is None:
+        if len(_SETTINGS) > 2048:
+            _SETTINGS.clear()
+        s = _SETTINGS[key] = _build_settings(cfg, t)
+    return s
+
+# ================== bandar_nightly (typed) ==================
+class BandarSettings(NamedTuple):
+    screener_name: str = "akum ihsg"   # bandar.screener_name — nama screener tersimpan
+    template_id: int = 4272542         # bandar.template_id
+    per_page: int = 2000               # bandar.per_page — baris hasil screener
+    timeout_ms: int = 60000            # bandar.timeout_ms — batas capture browser
+    retries: int = 2                   # bandar.retries — percobaan ulang capture
+    retry_sleep_sec: float = 5.0       # bandar.retry_sleep_sec
+    debug: bool = False                # bandar.debug — screenshot debug ke data/bandar/raw
+    rolling_days: int = 5              # bandar.rolling_days — hari bursa akumulasi rolling
+    max_symbols: int = 20              # bandar.max_symbols — baris laporan
+    streak_min: int = 3                # bandar.streak_min — seksi "streak 2BA+ >= N hari"
+    max_section: int = 15              # bandar.max_section — simbol per seksi transisi
+
+# env lama (workflow) tetap menimpa config.yaml
+_BANDAR_ENV = {
+    "screener_name": "BANDAR_SCREENER_NAME",
+    "template_id": "BANDAR_TEMPLATE_ID",
+    "timeout_ms": "BANDAR_TIMEOUT_MS",
+    "retries": "BANDAR_RETRIES",
+    "retry_sleep_sec": "BANDAR_RETRY_SLEEP",
+    "debug": "BANDAR_DEBUG",
+}
+
+_BANDAR = {}
+
+def bandar_settings():
+    """BandarSettings dari blok bandar di config.yaml (+ override env BANDAR_*), mengikuti config terbaru."""
+    cfg = load_config()
+    s = _BANDAR.get(_VERSION)
+    if s is not None:
+        return s
+    block = cfg.get("bandar") or {}
+    vals = {}
+    for name, typ in BandarSettings.__annotations__.items():
+        v = os.environ.get(_BANDAR_ENV.get(name, ""), block.get(name))
+        if v is None:
+            continue
+        try:
+            vals[name] = _coerce(typ, v)
+        except (TypeError, ValueError):
+            print(f"[CONFIG] bandar.{name}={v!r} tidak valid; diabaikan")
+    _BANDAR.clear()
+    s = _BANDAR[_VERSION] = BandarSettings(**vals)
+    return s
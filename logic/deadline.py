@@ -0,0 +1,111 @@
+# logic/deadline.py — batas waktu total per snapshot + sub-budget per stage (laporan tetap tepat waktu)
+import threading, time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+from logic.config import load_config
+from logic import metrics
+from logic.profiling import profile_task
+
+# detik; override lewat blok deadline di config.yaml
+DEFAULTS = {"total_sec": 90, "stages": {"movers": 20, "running_trade": 20, "powerbuy": 45}}
+MIN_REQUEST_TIMEOUT = 0.5
+
+_LOCAL = threading.local()   # .end = batas monotonic stage yang sedang dijalankan thread ini
+_EXEC = None
+_EXEC_LOCK = threading.Lock()
+
+def _executor():
+    global _EXEC
+    with _EXEC_LOCK:
+        if _EXEC is None:
+            _EXEC = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stage")
+        return _EXEC
+
+def request_timeout(default):
+    """
+    Timeout HTTP untuk thread ini: dibatasi sisa deadline stage (bila ada).
+    Stage yang sudah lewat batas → TimeoutError (thread yang ditinggalkan berhenti cepat).
+    """
+    end = getattr(_LOCAL, "end", None)
+    if end is None:
+        return default
+    left = end - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("deadline stage habis")
+    return max(MIN_REQUEST_TIMEOUT, min(default, left))
+
+def current_end():
+    return getattr(_LOCAL, "end", None)
+
+@contextmanager
+def bound(end):
+    """Pasang batas `end` (monotonic) untuk thread ini; batas luar yang lebih ketat tetap berlaku."""
+    prev = getattr(_LOCAL, "end", None)
+    _LOCAL.end = end if prev is None else (prev if end is None else min(prev, end))
+    try:
+        yield _LOCAL.end
+    finally:
+        _LOCAL.end = prev
+
+def run_bound(end, fn, *args, **kw):
+    """fn(*args) di thread lain dengan batas yang sama (untuk worker pool); ikut LoopProfiler bila aktif."""
+    with bound(end):
+        return profile_task(fn, *args, **kw)
+
+class Deadline:
+    """
+    Satu snapshot = satu Deadline. Stage dijalankan di thread (submit) dan ditunggu paling lama
+    sampai min(mulai + budget stage, batas total); yang terlambat dicatat di .missed dan
+    hasilnya diganti default — laporan dikirim dengan bagian yang sudah selesai.
+    """
+    def __init__(self, total_sec, stages=None):
+        self.total_sec = float(total_sec)
+        self.end = time.monotonic() + self.total_sec
+        self.stages = dict(stages or {})
+        self.missed = []
+        self.errors = []   # [(stage, exception)] stage yang gagal (bukan sekadar lambat)
+
+    @classmethod
+    def for_snapshot(cls, cfg=None):
+        c = (cfg if cfg is not None else load_config()).get("deadline") or {}
+        stages = dict(DEFAULTS["stages"])
+        stages.update(c.get("stages") or {})
+        return cls(c.get("total_sec", DEFAULTS["total_sec"]), stages)
+
+    def remaining(self):
+        return max(0.0, self.end - time.monotonic())
+
+    def stage_end(self, stage):
+        b = self.stages.get(stage)
+        return self.end if b is None else min(self.end, time.monotonic() + float(b))
+
+    @contextmanager
+    def stage(self, stage):
+        """Stage yang berjalan di thread pemanggil: request HTTP di dalamnya ikut dibatasi."""
+        with bound(self.stage_end(stage)) as end:
+            yield end
+
+    def submit(self, stage, fn, *args, **kw):
+        end = self.stage_end(stage)
+        fut = _executor().submit(run_bound, end, fn, *args, **kw)
+        fut.stage, fut.end = stage, end
+        return fut
+
+    def result(self, fut, default=None):
+        """Hasil stage, atau default bila lewat batas / gagal (dicatat di .missed dan .errors)."""
+        try:
+            return fut.result(timeout=max(0.0, fut.end - time.monotonic()))
+        except FutureTimeout:
+            fut.cancel()
+            self.miss(fut.stage)
+        except Exception as e:
+            self.errors.append((fut.stage, e))
+            self.miss(fut.stage, cause="error", detail=str(e))
+        return default
+
+    def miss(self, stage, cause="timeout", detail="melewati batas"):
+        if stage not in self.missed:
+            self.missed.append(stage)
+            metrics.inc("stage_partial", stage=stage, cause=cause)
+            print(f"[DEADLINE] stage {stage} {detail}; laporan dikirim parsial")
@@ -0,0 +1,99 @@
+# logic/fixtures.py — payload API Stockbit: rekaman (data/fixtures) atau sintetis
+import os, json, random, string
+from pathlib import Path
+
+FIXTURE_DIR = Path(os.environ.get("STOCKBIT_FIXTURE_DIR", "data/fixtures"))
+
+_BASE = ["BBCA", "BBRI", "BMRI", "TLKM", "ASII", "GOTO", "ANTM", "ADRO", "MDKA", "BRIS",
+         "UNVR", "ICBP", "PGAS", "PTBA", "INCO", "BUMI", "MEDC", "AMMN", "CUAN", "BREN"]
+
+def universe(n=800, seed=7):
+    """Daftar simbol: ticker umum + kode 4 huruf acak (deterministik)."""
+    rnd = random.Random(seed)
+    out = list(_BASE[:n])
+    seen = set(out)
+    while len(out) < n:
+        s = "".join(rnd.choice(string.ascii_uppercase) for _ in range(4))
+        if s not in seen:
+            seen.add(s); out.append(s)
+    return out
+
+def market_mover(n=100, seed=1, syms=None):
+    rnd = random.Random(seed)
+    syms = syms or universe()
+    rows = []
+    for s in rnd.sample(syms, min(n, len(syms))):
+        price = rnd.choice((50, 100, 500, 1000, 2500, 5000, 9000)) + rnd.randint(0, 40)
+        rows.append({
+            "stock_detail": {"code": s, "name": f"{s} Tbk"},
+            "price": price,
+            "change": {"percentage": round(rnd.uniform(-10, 25), 2)},
+            "value": {"raw": rnd.randint(10**8, 10**12)},
+        })
+    rows.sort(key=lambda r: r["change"]["percentage"], reverse=True)
+    return {"data": {"mover_list": rows}}
+
+def running_trade(n=500, seed=2, syms=None, start_id=1):
+    rnd = random.Random(seed)
+    syms = syms or universe(200)
+    rows = []
+    for i in range(n):
+        price = rnd.choice((50, 100, 500, 1000, 2500, 5000)) + rnd.randint(0, 40)
+        lot = rnd.randint(1, 5000)
+        rows.append({
+            "id": start_id + i,
+            "time": f"{9 + i // 3600 % 7:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            "code": rnd.choice(syms),
+            "price": str(price),
+            "lot": str(lot),
+            "action": rnd.choice(("buy", "sell")),
+        })
+    return {"data": {"running_trade": rows}}
+
+def powerbuy(symbol="BBCA", buckets=40, seed=3):
+    rnd = random.Random(f"{seed}:{symbol}")
+    book = [{"buy": {"lot": f"{rnd.randint(0, 90000):,}"},
+             "sell": {"lot": f"{rnd.randint(0, 90000):,}"}} for _ in range(buckets)]
+    return {"data": {"book": book}}
+
+def screener(n=2000, seed=4, syms=None):
+    rnd = random.Random(seed)
+    syms = syms or universe(max(n, 800))
+    rows = [[s, round(rnd.uniform(-45, 45), 2)] for s in syms[:n]]
+    return {"data": {"columns": ["Symbol", "Value"], "rows": rows}}
+
+SYNTHETIC = {
+    "top_gainer": lambda seed=1, **kw: market_mover(seed=f"gainer:{seed}", **kw),
+    "top_value": lambda seed=1, **kw: market_mover(seed=f"value:{seed}", **kw),
+    "running_trade": running_trade,
+    "powerbuy": powerbuy,
+    "screener": screener,
+}
+
+def load_fixture(name, hhmm=None, symbol=None, root: Path = FIXTURE_DIR):
+    """
+    Cari rekaman: root/<HHMM terakhir <= hhmm>/<name>[_<symbol>].json, lalu root/<name>[_<symbol>].json.
+    None kalau tidak ada rekaman.
+    """
+    names = ([f"{name}_{symbol}.json"] if symbol else []) + [f"{name}.json"]
+    dirs = []
+    if hhmm and root.is_dir():
+        slots = sorted(p.name for p in root.iterdir() if p.is_dir() and p.name.isdigit() and p.name <= hhmm)
+        if slots:
+            dirs.append(root / slots[-1])
+    dirs.append(root)
+    for d in dirs:
+        for n in names:
+            p = d / n
+            if p.exists():
+                return json.loads(p.read_text(encoding="utf-8"))
+    return None
+
+def payload(name, hhmm=None, symbol=None, root: Path = FIXTURE_DIR, **kw):
+    """Rekaman kalau ada, selain itu payload sintetis."""
+    rec = load_fixture(name, hhmm=hhmm, symbol=symbol, root=root)
+    if rec is not None:
+        return rec
+    if name == "powerbuy":
+        kw.setdefault("symbol", symbol or "BBCA")
+    return SYNTHETIC[name](**kw)
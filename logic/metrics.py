@@ -0,0 +1,172 @@
+# logic/metrics.py — counter, histogram & span timing; ekspor Prometheus text / HTTP / JSON
+import os, json, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+# bucket latensi (detik) — cukup lebar untuk API lambat dan render cepat
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", "data/metrics"))
+
+_LOCK = threading.Lock()
+
+def _key(name, labels):
+    # nilai label selalu str: status=200 dan status="Timeout" harus bisa diurutkan bersama
+    return (name, tuple(sorted((k, str(v)) for k, v in (labels or {}).items())))
+
+def _fmt_labels(labels, extra=None):
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, v):
+        for i, b in enumerate(self.buckets):
+            if v <= b:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += v
+        self.max = max(self.max, v)
+
+    def quantile(self, q):
+        """Perkiraan kuantil: interpolasi linear di dalam bucket, dibatasi nilai max."""
+        if not self.count:
+            return None
+        target, acc, lo = q * self.count, 0, 0.0
+        for b, c in zip(self.buckets, self.counts):
+            if c and acc + c >= target:
+                return round(min(lo + (b - lo) * (target - acc) / c, self.max), 4)
+            acc += c
+            lo = b
+        return round(self.max, 4)
+
+class Registry:
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.hists = {}
+        self.t0 = time.time()
+
+    def inc(self, name, value=1, **labels):
+        k = _key(name, labels)
+        with _LOCK:
+            self.counters[k] = self.counters.get(k, 0) + value
+
+    def set(self, name, value, **labels):
+        with _LOCK:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        k = _key(name, labels)
+        with _LOCK:
+            h = self.hists.get(k)
+            if h is None:
+                h = self.hists[k] = Histogram()
+            h.observe(value)
+
+    def hist(self, name, **labels):
+        return self.hists.get(_key(name, labels))
+
+    # ---------- ekspor ----------
+    def prometheus(self):
+        out = []
+        with _LOCK:
+            for (name, labels), v in sorted(self.counters.items()):
+                out.append(f"rtvalue_{name}_total{_fmt_labels(labels)} {v}")
+            for (name, labels), v in sorted(self.gauges.items()):
+                out.append(f"rtvalue_{name}{_fmt_labels(labels)} {v}")
+            for (name, labels), h in sorted(self.hists.items()):
+                acc = 0
+                for b, c in zip(h.buckets, h.counts):
+                    acc += c
+                    out.append(f"rtvalue_{name}_bucket{_fmt_labels(labels, {'le': b})} {acc}")
+                out.append(f"rtvalue_{name}_bucket{_fmt_labels(labels, {'le': '+Inf'})} {h.count}")
+                out.append(f"rtvalue_{name}_sum{_fmt_labels(labels)} {h.sum:.6f}")
+                out.append(f"rtvalue_{name}_count{_fmt_labels(labels)} {h.count}")
+        return "\n".join(out) + "\n"
+
+    def summary(self):
+        def lab(labels):
+            return ",".join(f"{k}={v}" for k, v in labels) or "_"
+        with _LOCK:
+            return {
+                "uptime_sec": round(time.time() - self.t0, 1),
+                "counters": {f"{n}[{lab(l)}]": v for (n, l), v in sorted(self.counters.items())},
+                "gauges": {f"{n}[{lab(l)}]": v for (n, l), v in sorted(self.gauges.items())},
+                "histograms": {f"{n}[{lab(l)}]": {
+                    "count": h.count, "sum": round(h.sum, 4), "max": round(h.max, 4),
+                    "mean": round(h.sum / h.count, 4) if h.count else None,
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                } for (n, l), h in sorted(self.hists.items())},
+            }
+
+REGISTRY = Registry()
+
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set
+observe = REGISTRY.observe
+
+@contextmanager
+def span(stage, name="stage_seconds", **labels):
+    """with span("fetch_gainers"): ... → histogram durasi per stage (+ error counter)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        REGISTRY.inc("stage_errors", stage=stage, **labels)
+        raise
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - t0, stage=stage, **labels)
+
+def write_textfile(path=None):
+    """Tulis format Prometheus (mis. untuk node_exporter textfile collector) secara atomik."""
+    path = Path(path or METRICS_DIR / "rtvalue.prom")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(REGISTRY.prometheus(), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+def write_summary(name="session", path=None):
+    """Ringkasan JSON akhir sesi → data/metrics/<name>-<YYYYmmdd-HHMMSS>.json."""
+    path = Path(path or METRICS_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(REGISTRY.summary(), ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """GET /metrics (Prometheus) dan /summary (JSON). Port dari METRICS_PORT; None → tidak start."""
+    port = port if port is not None else int(os.environ.get("METRICS_PORT") or 0)
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/summary"):
+                body, ctype = json.dumps(REGISTRY.summary()).encode(), "application/json"
+            else:
+                body, ctype = REGISTRY.prometheus().encode(), "text/plain; version=0.0.4"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] http://{host}:{port}/metrics")
+    return srv
@@ -0,0 +1,102 @@
+# logic/parse_pool.py — decode JSON + parsing payload besar di luar thread polling
+import os, json
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+from logic.config import load_config
+from logic.profiling import profile_task
+from logic.rolling import parse_market_mover
+from logic.parsers import (extract_rt_list, aggregate_rt, tape_span, coerce_dict,
+                           extract_pb_rows, pb_total, parse_akumulasi)
+
+try:  # decoder cepat bila terpasang (pip install orjson)
+    import orjson
+
+    def loads(raw):
+        return orjson.loads(raw)
+    DECODER = "orjson"
+except ImportError:
+    def loads(raw):
+        return json.loads(raw)
+    DECODER = "json"
+
+# ================== Fungsi worker (top-level → bisa di-pickle untuk process pool) ==================
+# Parser dari logic.parsers/logic.rolling (stdlib saja): worker proses tidak memuat runners/*.
+def _decode(raw):
+    return loads(raw) if isinstance(raw, (bytes, bytearray, str)) else raw
+
+def mover_from_bytes(raw, limit=None):
+    """parse_market_mover tanpa field 'raw' (hasil ringkas, murah dikirim antar proses)."""
+    out = parse_market_mover(_decode(raw))
+    if limit is not None:
+        out = out[:limit]
+    for r in out:
+        r.pop("raw", None)
+    return out
+
+def rt_agg_from_bytes(raw):
+    """→ (agg {sym: {value,lot,price}}, jumlah item, jumlah skip, rentang waktu tape dalam detik)."""
+    rt_list = extract_rt_list(_decode(raw))
+    agg, skipped = aggregate_rt(rt_list)
+    return agg, len(rt_list), skipped, tape_span(rt_list)
+
+def rt_trades_from_bytes(raw):
+    """Poll running trade (rt_alerts) → list dict trade yang valid."""
+    return [t for t in map(coerce_dict, extract_rt_list(_decode(raw))) if t]
+
+def pb_total_from_bytes(raw, symbol):
+    """Satu buku PowerBuy → total buy/sell lot simbol itu (None bila kosong)."""
+    rows = extract_pb_rows(_decode(raw))
+    return pb_total(symbol, rows) if rows else None
+
+def akumulasi_from_bytes(raw):
+    """Hasil screener akumulasi (±2000 baris) → [{'symbol','value'}]."""
+    return parse_akumulasi(_decode(raw))
+
+# ================== Pool ==================
+class _InlineExecutor:
+    """Mode 'off': jalankan langsung, tetap mengembalikan Future supaya pemanggil seragam."""
+    def submit(self, fn, *args, **kw):
+        f = Future()
+        try:
+            f.set_result(fn(*args, **kw))
+        except Exception as e:
+            f.set_exception(e)
+        return f
+
+    def shutdown(self, wait=True):
+        pass
+
+class ParsePool:
+    """
+    mode: 'off' (inline), 'thread', atau 'process' (CPU parsing benar-benar lepas dari GIL loop).
+    Default dari env PARSE_POOL / PARSE_WORKERS atau blok parse_pool di config.yaml.
+    """
+    def __init__(self, mode=None, workers=None):
+        cfg = load_config().get("parse_pool") or {}
+        self.mode = (mode or os.environ.get("PARSE_POOL") or cfg.get("mode") or "off").lower()
+        self.workers = int(workers or os.environ.get("PARSE_WORKERS") or cfg.get("workers") or 2)
+        if self.mode == "process":
+            self._ex = ProcessPoolExecutor(max_workers=self.workers)
+        elif self.mode == "thread":
+            self._ex = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+        else:
+            self.mode = "off"
+            self._ex = _InlineExecutor()
+
+    def submit(self, fn, raw, *args, **kw):
+        if self.mode == "thread":
+            return self._ex.submit(profile_task, fn, raw, *args, **kw)
+        return self._ex.submit(fn, raw, *args, **kw)
+
+    def shutdown(self):
+        self._ex.shutdown(wait=True)
+
+_POOL = None
+
+def get_pool():
+    global _POOL
+    if _POOL is None:
+        _POOL = ParsePool()
+        if _POOL.mode != "off":
+            print(f"[PARSE] pool={_POOL.mode} workers={_POOL.workers} decoder={DECODER}")
+    return _POOL
@@ -0,0 +1,184 @@
+# logic/parsers.py — parser payload Stockbit (running trade, PowerBuy, screener akumulasi)
+# Sengaja ringan (hanya stdlib): dipakai runner dan worker logic.parse_pool tanpa ikut memuat
+# runners/* (klien HTTP, Playwright, notif).
+import json
+
+def coerce_dict(x):
+    if isinstance(x, dict):
+        return x
+    if isinstance(x, str):
+        try:
+            j = json.loads(x)
+            return j if isinstance(j, dict) else None
+        except Exception:
+            return None
+    return None
+
+def extract_rt_list(rt_raw):
+    """Support struktur baru: {'data': {'running_trade': [...]}} + fallback lama."""
+    if isinstance(rt_raw, dict):
+        d = rt_raw.get("data")
+        if isinstance(d, dict) and isinstance(d.get("running_trade"), list):
+            return d["running_trade"]
+        for key in ("data", "result", "items"):
+            v = rt_raw.get(key)
+            if isinstance(v, list):
+                return v
+            if isinstance(v, dict) and isinstance(v.get("items"), list):
+                return v["items"]
+        return []
+    if isinstance(rt_raw, list):
+        return rt_raw
+    return []
+
+def _clock_sec(s):
+    """'HH:MM:SS' → detik sejak tengah malam; None bila tak terbaca."""
+    try:
+        h, m, sec = str(s).split(":")[:3]
+        return int(h) * 3600 + int(m) * 60 + int(float(sec))
+    except Exception:
+        return None
+
+def trade_clock_sec(t):
+    """Jam bursa trade (dict running_trade) → detik sejak tengah malam; None bila tak ada/tak terbaca."""
+    return _clock_sec(t.get("time") or t.get("trade_time"))
+
+def tape_span(rt_list):
+    """Rentang jam (detik) yang dicakup tape RT: trade terbaru − tertua; 0 bila tak terbaca."""
+    secs = []
+    for raw in rt_list:
+        t = coerce_dict(raw)
+        x = trade_clock_sec(t) if t else None
+        if x is not None:
+            secs.append(x)
+    return max(secs) - min(secs) if secs else 0
+
+def _to_num(s):
+    """Konversi string angka (punya koma/titik/persen/dash) → int aman."""
+    if s is None: return 0
+    if isinstance(s, (int, float)): return int(s)
+    s = str(s).strip()
+    if s in ("", "-", "—"): return 0
+    s = s.replace(",", "").replace(".", "").replace("%", "")
+    try:
+        return int(float(s))
+    except Exception:
+        return 0
+
+def aggregate_rt(rt_list):
+    """Aggregate RT per simbol → ({sym: {'value','lot','price','trades'}}, jumlah baris di-skip)."""
+    agg = {}
+    skipped = 0
+    for raw in rt_list:
+        t = coerce_dict(raw)
+        if not t:
+            skipped += 1
+            continue
+        s = t.get("symbol") or t.get("stock") or t.get("code")
+        if not s:
+            skipped += 1
+            continue
+        try:
+            price = int(float(t.get("price") or t.get("trade_price") or t.get("last") or 0))
+        except Exception:
+            price = 0
+        try:
+            lot = int(float(t.get("lot") or t.get("volume") or 0))
+        except Exception:
+            lot = 0
+        try:
+            val = int(float(t.get("value") or (price * lot * 100)))
+        except Exception:
+            val = price * lot * 100
+
+        cur = agg.get(s, {"value":0,"lot":0,"price":price,"trades":0})
+        cur["value"] += max(0, val)
+        cur["lot"]   += max(0, lot)
+        cur["trades"] += 1
+        if price:
+            cur["price"] = price
+        agg[s] = cur
+    return agg, skipped
+
+def extract_pb_rows(pb_obj):
+    if not isinstance(pb_obj, dict): return []
+    d = pb_obj.get("data")
+    if isinstance(d, dict) and isinstance(d.get("book"), list):   # struktur terbaru
+        return d["book"]
+    # fallback kemungkinan lama
+    if isinstance(d, dict) and isinstance(d.get("intervals"), list):
+        return d["intervals"]
+    if isinstance(d, dict) and isinstance(d.get("items"), list):
+        return d["items"]
+    return []
+
+def pb_total(sym, rows):
+    tot_buy = tot_sell = 0
+    for r in rows:
+        buy  = (r.get("buy")  or {})
+        sell = (r.get("sell") or {})
+        tot_buy  += _to_num(buy.get("lot"))
+        tot_sell += _to_num(sell.get("lot"))
+    total_lot = tot_buy + tot_sell
+    return {
+        "symbol": sym,
+        "buy_lot": tot_buy,
+        "sell_lot": tot_sell,
+        "total_lot": total_lot,
+        "buy_ratio": (tot_buy / total_lot) if total_lot > 0 else None
+    }
+
+def _norm_symbol(x):
+    if not x: return None
+    s = str(x).strip().upper()
+    return "".join(ch for ch in s if ch.isalnum())
+
+def parse_akumulasi(resp):
+    out = []
+    def _try_rows(rows):
+        nonlocal out
+        if not isinstance(rows, list): return
+        if rows and isinstance(rows[0], dict):
+            for r in rows:
+                sym = _norm_symbol(r.get("symbol") or r.get("code") or r.get("stock") or r.get("ticker"))
+                if not sym: continue
+                val = r.get("value")
+                if val is None:
+                    val = r.get("akum") or r.get("accum") or r.get("score") or r.get("C") or r.get("c")
+                try: out.append({"symbol": sym, "value": float(val)})
+                except Exception: continue
+    def _try_table(columns, rows):
+        nonlocal out
+        if not isinstance(columns, list) or not isinstance(rows, list): return
+        cols = [str(c).lower() for c in columns]
+        try: i_sym = next(i for i,c in enumerate(cols) if c in ("symbol","code","stock","ticker"))
+        except StopIteration: return
+        cand_vals = ("value","akum","accum","score","c")
+        i_val = next((cols.index(k) for k in cand_vals if k in cols), None)
+        if i_val is None: return
+        for row in rows:
+            if not isinstance(row, (list, tuple)) or len(row) <= max(i_sym, i_val): continue
+            sym = _norm_symbol(row[i_sym]); 
+            if not sym: continue
+            try: out.append({"symbol": sym, "value": float(row[i_val])})
+            except Exception: continue
+
+    if isinstance(resp, dict):
+        d = resp.get("data") or {}
+        if isinstance(d.get("columns"), list) and isinstance(d.get("rows"), list): _try_table(d["columns"], d["rows"])
+        if isinstance(d.get("rows"), list): _try_rows(d["rows"])
+        if isinstance(d.get("data"), list): _try_rows(d["data"])
+        for key in ("rows","items","list","data"):
+            v = resp.get(key)
+            if isinstance(v, list): _try_rows(v)
+    elif isinstance(resp, list):
+        for r in resp:
+            if isinstance(r, dict):
+                sym = _norm_symbol(r.get("symbol") or r.get("code") or r.get("stock") or r.get("ticker"))
+                if not sym: continue
+                val = r.get("value") or r.get("akum") or r.get("accum") or r.get("score") or r.get("C") or r.get("c")
+                try: out.append({"symbol": sym, "value": float(val)})
+                except Exception: continue
+
+    uniq = {r["symbol"]: r["value"] for r in out}
+    return [{"symbol": s, "value": v} for s, v in uniq.items()]
@@ -0,0 +1,158 @@
+# logic/profiling.py — profiling opt-in per iterasi loop (cProfile / tracemalloc)
+import os, cProfile, pstats, threading, time, tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from logic.config import load_config
+from logic import metrics
+
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "data/profile"))
+# file kontrol: tulis "cpu", "mem", "cpu,mem" atau "off" untuk mengubah mode tanpa restart
+CONTROL_FILE = PROFILE_DIR / "mode"
+
+# LoopProfiler yang sedang men-sample cpu; worker thread (stage deadline, PowerBuy, parse pool mode thread)
+# ikut diprofil lewat profile_task dan digabung ke dump iterasi itu. Pool mode process tidak tercakup.
+_ACTIVE = None
+
+def profile_task(fn, *args, **kw):
+    """Jalankan fn (di worker thread); saat iterasi loop sedang di-sample, profil task ini ikut ke dump."""
+    sink = _ACTIVE
+    if sink is None or threading.get_ident() == sink._thread:
+        return fn(*args, **kw)   # thread loop sendiri sudah diprofil (mis. parse pool mode off)
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        return fn(*args, **kw)
+    finally:
+        prof.disable()
+        sink._add_task(prof)
+
+def _parse_modes(s):
+    s = (s or "").strip().lower()
+    if s in ("", "0", "off", "none", "false"):
+        return frozenset()
+    return frozenset(m.strip() for m in s.split(",") if m.strip() in ("cpu", "mem"))
+
+class LoopProfiler:
+    """
+    with prof.iteration(): ...   # bungkus satu iterasi loop
+    - setiap iterasi: waktu CPU diukur (murah) dan dibandingkan cpu_budget_ms
+    - tiap `every` iterasi (bila mode aktif): cProfile → <name>-<ts>-<i>.prof,
+      tracemalloc → diff top-N alokasi → <name>-<ts>-<i>.mem.txt
+    - .prof mencakup thread loop + task worker yang dibungkus profile_task selama iterasi itu
+    - dump dirotasi: hanya `keep` file terbaru per runner
+    """
+    def __init__(self, name, modes=None, every=None, keep=None, top_n=None,
+                 cpu_budget_ms=None, mem_budget_kb=None, out_dir=PROFILE_DIR):
+        cfg = load_config().get("profiling") or {}
+        env = os.environ.get
+        self.name = name
+        self.out_dir = Path(out_dir)
+        self.base_modes = _parse_modes(modes if modes is not None else env("RTVALUE_PROFILE", cfg.get("mode", "")))
+        self.every = int(every or env("PROFILE_EVERY") or cfg.get("every", 30))
+        self.keep = int(keep or env("PROFILE_KEEP") or cfg.get("keep", 20))
+        self.top_n = int(top_n or env("PROFILE_TOP_N") or cfg.get("top_n", 15))
+        self.cpu_budget_ms = float(cpu_budget_ms or env("PROFILE_CPU_BUDGET_MS") or cfg.get("cpu_budget_ms", 500))
+        self.mem_budget_kb = float(mem_budget_kb or env("PROFILE_MEM_BUDGET_KB") or cfg.get("mem_budget_kb", 2048))
+        self.i = 0
+        self._ctl_mtime = None
+        self._ctl_modes = None
+        self._thread = None
+        self._tasks = []
+        self._tasks_lock = threading.Lock()
+
+    def _add_task(self, prof):
+        with self._tasks_lock:
+            self._tasks.append(prof)
+
+    def modes(self):
+        """Mode efektif: file kontrol (bila ada) menang atas env/config."""
+        try:
+            m = CONTROL_FILE.stat().st_mtime
+        except OSError:
+            self._ctl_mtime = self._ctl_modes = None
+            return self.base_modes
+        if m != self._ctl_mtime:
+            self._ctl_mtime = m
+            self._ctl_modes = _parse_modes(CONTROL_FILE.read_text(encoding="utf-8"))
+            print(f"[PROFILE] {self.name}: mode → {','.join(sorted(self._ctl_modes)) or 'off'}")
+        return self._ctl_modes
+
+    @contextmanager
+    def iteration(self):
+        global _ACTIVE
+        self.i += 1
+        modes = self.modes()
+        sample = bool(modes) and self.i % self.every == 0
+        prof = cProfile.Profile() if sample and "cpu" in modes else None
+        snap0 = None
+        if "mem" in modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+            if sample:
+                snap0 = tracemalloc.take_snapshot()
+        elif tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        cpu0 = time.process_time()
+        if prof:
+            self._thread, self._tasks = threading.get_ident(), []
+            _ACTIVE = self
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+                _ACTIVE = None
+            cpu_ms = (time.process_time() - cpu0) * 1000.0
+            metrics.observe("loop_cpu_seconds", cpu_ms / 1000.0, runner=self.name)
+
+            diff, growth_kb = None, 0.0
+            if snap0 is not None:
+                diff = tracemalloc.take_snapshot().compare_to(snap0, "lineno")
+                growth_kb = sum(d.size_diff for d in diff) / 1024.0
+                metrics.set_gauge("loop_mem_growth_kb", round(growth_kb, 1), runner=self.name)
+
+            over = cpu_ms > self.cpu_budget_ms or growth_kb > self.mem_budget_kb
+            if over:
+                metrics.inc("loop_over_budget", runner=self.name)
+                print(f"[PROFILE] {self.name} iter#{self.i} melewati budget: "
+                      f"cpu={cpu_ms:.0f}ms (≤{self.cpu_budget_ms:.0f}) mem={growth_kb:+.0f}KB (≤{self.mem_budget_kb:.0f})")
+            if prof or diff is not None:
+                self._dump(prof, diff, cpu_ms, growth_kb, over)
+
+    def _dump(self, prof, diff, cpu_ms, growth_kb, over):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{self.i}{'-OVER' if over else ''}"
+        if prof:
+            stats = pstats.Stats(prof)
+            with self._tasks_lock:
+                tasks, self._tasks = self._tasks, []
+            for t in tasks:
+                try:
+                    stats.add(t)
+                except TypeError:   # task tanpa catatan (selesai sebelum ada panggilan terprofil)
+                    pass
+            stats.dump_stats(str(self.out_dir / f"{stem}.prof"))
+        if diff is not None:
+            lines = [f"# {self.name} iter#{self.i} cpu={cpu_ms:.1f}ms growth={growth_kb:+.1f}KB "
+                     f"traced={tracemalloc.get_traced_memory()[0] / 1024:.0f}KB"]
+            lines += [str(d) for d in diff[:self.top_n]]
+            (self.out_dir / f"{stem}.mem.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self._rotate()
+
+    def _rotate(self):
+        files = sorted(self.out_dir.glob(f"{self.name}-*"), key=lambda p: p.stat().st_mtime, reverse=True)
+        stems = []
+        for p in files:
+            s = p.name.split(".", 1)[0]
+            if s not in stems:
+                stems.append(s)
+        old = set(stems[self.keep:])
+        for p in files:
+            if p.name.split(".", 1)[0] in old:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,217 @@
+# logic/rt_ring.py — ring buffer running trade di file mmap: 1 producer (rt_alerts), banyak reader
+# Producer dan reader harus di host (filesystem) yang sama: di workflow Stockbit Live, rt_alerts dan
+# market_loop dijalankan dalam satu job. Tanpa producer, reader.fresh() False → snap_once unduh sendiri.
+import os, mmap, struct, zlib
+from datetime import datetime, time as dtime
+from pathlib import Path
+
+from logic.clock import get_clock
+from logic.parsers import trade_clock_sec
+from logic.trading_calendar import TZ
+
+RING_PATH = Path(os.environ.get("RT_RING_PATH", "data/rt_ring.bin"))
+RING_CAPACITY = int(os.environ.get("RT_RING_CAPACITY", "65536"))
+# detik; lebih tua → producer dianggap mati. > cadence.running_trade.max_sec + latensi poll
+RING_MAX_AGE = float(os.environ.get("RT_RING_MAX_AGE", "30"))
+
+MAGIC = b"RTRING01"
+# header: magic, capacity, record size, write_seq (total record selesai ditulis), heartbeat (epoch clock publish),
+#         claim_seq (batas atas record yang sedang ditulis; seqlock untuk reader)
+_HDR = struct.Struct("<8sIIQd")
+HDR_SIZE = 64
+# record: trade id, ts (epoch jam trade di bursa, bukan waktu publish), symbol, price, lot, value
+_REC = struct.Struct("<qd8sqqq")
+REC_SIZE = _REC.size
+_SEQ_OFF = 16    # offset write_seq di header
+_HB_OFF = 24     # offset heartbeat di header
+_CLAIM_OFF = 32  # offset claim_seq di header
+
+def _epoch():
+    return get_clock().now().timestamp()
+
+def _day_start(now):
+    """Epoch 00:00 WIB hari `now`: jam trade 'HH:MM:SS' + ini = epoch trade."""
+    return TZ.localize(datetime.combine(now.date(), dtime())).timestamp()
+
+def _num(x):
+    try:
+        return int(float(x))
+    except Exception:
+        return 0
+
+def normalize(t, day0=None, fallback=None):
+    """
+    dict trade (format running_trade Stockbit) → tuple record; None bila tak ada simbol.
+    ts = day0 (lihat _day_start) + jam trade; tanpa jam terbaca → fallback (waktu publish).
+    """
+    sym = t.get("symbol") or t.get("stock") or t.get("code")
+    if not sym:
+        return None
+    price = _num(t.get("price") or t.get("trade_price") or t.get("last"))
+    lot = _num(t.get("lot") or t.get("volume"))
+    value = _num(t.get("value")) or price * lot * 100
+    tid = t.get("id") or t.get("trade_number") or t.get("trade_id")
+    try:
+        tid = int(tid)
+    except Exception:
+        tid = zlib.crc32(repr((t.get("time"), sym, price, lot)).encode())
+    sec = trade_clock_sec(t)
+    ts = day0 + sec if day0 is not None and sec is not None else (fallback or _epoch())
+    return (tid, ts, str(sym).encode()[:8], price, lot, value)
+
+def _open_map(path, size, write):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT if write else os.O_RDONLY)
+    try:
+        if write and os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+        return mmap.mmap(fd, size, access=mmap.ACCESS_WRITE if write else mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+class RingWriter:
+    """
+    Producer tunggal, protokol seqlock: claim_seq dinaikkan dulu (slot s.d. claim_seq sedang ditimpa),
+    lalu record ditulis, lalu write_seq = claim_seq. Reader membuang slot yang mungkin tertimpa.
+    """
+    def __init__(self, path=RING_PATH, capacity=RING_CAPACITY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self._mm = _open_map(self.path, HDR_SIZE + capacity * REC_SIZE, write=True)
+        magic, cap, rec, seq, _ = _HDR.unpack_from(self._mm, 0)
+        if magic != MAGIC or cap != capacity or rec != REC_SIZE:
+            seq = 0
+            _HDR.pack_into(self._mm, 0, MAGIC, capacity, REC_SIZE, 0, 0.0)
+        struct.pack_into("<Q", self._mm, _CLAIM_OFF, seq)
+        self.seq = seq
+
+    def publish(self, trades, now=None):
+        """trades: dict mentah atau tuple hasil normalize(). Return jumlah record ditulis."""
+        now = now or get_clock().now()
+        day0, pub = _day_start(now), now.timestamp()
+        recs = [r for r in ((normalize(t, day0, pub) if isinstance(t, dict) else t) for t in trades)
+                if r is not None]
+        seq = self.seq
+        struct.pack_into("<Q", self._mm, _CLAIM_OFF, seq + len(recs))
+        for rec in recs:
+            _REC.pack_into(self._mm, HDR_SIZE + (seq % self.capacity) * REC_SIZE, *rec)
+            seq += 1
+        self.seq = seq
+        struct.pack_into("<Q", self._mm, _SEQ_OFF, seq)
+        self.heartbeat()
+        return len(recs)
+
+    def heartbeat(self):
+        struct.pack_into("<d", self._mm, _HB_OFF, _epoch())
+
+    def close(self):
+        self._mm.close()
+
+class RingReader:
+    """
+    Reader dengan cursor sendiri. read() = record baru sejak cursor;
+    tail(n) = n record terakhir. Unpack langsung dari memoryview mmap (tanpa salinan buffer).
+    """
+    def __init__(self, path=RING_PATH, from_start=False):
+        self.path = Path(path)
+        self._mm = None
+        self.cursor = 0
+        self.lost = 0
+        self._from_start = from_start
+
+    def _map(self):
+        if self._mm is None:
+            if not self.path.exists():
+                return None
+            size = self.path.stat().st_size
+            if size < HDR_SIZE:
+                return None
+            mm = _open_map(self.path, size, write=False)
+            magic, cap, rec, seq, _ = _HDR.unpack_from(mm, 0)
+            if magic != MAGIC or rec != REC_SIZE:
+                mm.close()
+                return None
+            self._mm, self.capacity = mm, cap
+            self._view = memoryview(mm)
+            self.cursor = 0 if self._from_start else seq
+        return self._mm
+
+    def write_seq(self):
+        return struct.unpack_from("<Q", self._mm, _SEQ_OFF)[0]
+
+    def claim_seq(self):
+        """Batas atas record yang sudah/sedang ditulis producer (>= write_seq)."""
+        return max(struct.unpack_from("<Q", self._mm, _CLAIM_OFF)[0], self.write_seq())
+
+    def age(self):
+        """Detik sejak publish/heartbeat terakhir producer (inf bila belum ada ring)."""
+        if self._map() is None:
+            return float("inf")
+        hb = struct.unpack_from("<d", self._mm, _HB_OFF)[0]
+        return _epoch() - hb if hb else float("inf")
+
+    def fresh(self, max_age=RING_MAX_AGE):
+        # heartbeat di masa depan = domain waktu lain (mis. replay VirtualClock) → bukan producer hidup
+        return 0 <= self.age() <= max_age
+
+    def _range(self, start, end):
+        cap = self.capacity
+        out = []
+        while start < end:
+            slot = start % cap
+            stop = min(end, start + (cap - slot))
+            a = HDR_SIZE + slot * REC_SIZE
+            out.extend(_REC.iter_unpack(self._view[a:a + (stop - start) * REC_SIZE]))
+            start = stop
+        return out
+
+    def _read(self, start, end):
+        recs = self._range(start, end)
+        # seqlock: baca ulang claim_seq SETELAH menyalin. Record < claim - capacity mungkin sudah/sedang
+        # ditimpa producer selama kita menyalin (bisa sobek) → buang
+        overwritten = min(self.claim_seq() - self.capacity - start, len(recs))
+        if overwritten > 0:
+            recs = recs[overwritten:]
+            self.lost += overwritten
+        return recs
+
+    def read(self, max_records=None):
+        """Record baru sejak cursor (tertua dulu); cursor maju."""
+        if self._map() is None:
+            return []
+        end = self.write_seq()
+        start = max(self.cursor, end - self.capacity)
+        if start > self.cursor:
+            self.lost += start - self.cursor
+        if max_records is not None:
+            end = min(end, start + max_records)
+        self.cursor = end
+        return self._read(start, end)
+
+    def tail(self, n):
+        """n record terakhir (tertua dulu) tanpa menggeser cursor."""
+        if self._map() is None:
+            return []
+        end = self.write_seq()
+        return self._read(max(0, end - min(n, self.capacity)), end)
+
+    def close(self):
+        if self._mm is not None:
+            self._view.release()
+            self._mm.close()
+            self._mm = None
+
+def aggregate_records(recs):
+    """Record ring → {sym: {'value','lot','price','trades'}} (bentuk sama dengan snap_once._aggregate_rt)."""
+    agg = {}
+    for _, _, sym, price, lot, value in recs:
+        s = sym.rstrip(b"\0").decode()
+        cur = agg.get(s)
+        if cur is None:
+            cur = agg[s] = {"value": 0, "lot": 0, "price": price, "trades": 0}
+        cur["value"] += max(0, value)
+        cur["lot"] += max(0, lot)
+        cur["trades"] += 1
+        if price:
+            cur["price"] = price
+    return agg
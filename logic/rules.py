@@ -1,3 +1,5 @@
+from logic.trading_calendar import get_calendar, ACTIVE_PHASES
+
 def is_market_open_jkt(dt):
-    hhmm = dt.strftime("%H%M")
-    return "0855" <= hhmm <= "1600"
+    """True saat bursa menerima order (pre-opening s/d pre-closing, di luar istirahat & libur)."""
+    return get_calendar().is_open(dt, phases=ACTIVE_PHASES)
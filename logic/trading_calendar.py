@@ -0,0 +1,170 @@
+# logic/trading_calendar.py — kalender & sesi perdagangan BEI (precomputed)
+import os
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+import pytz
+
+TZ = pytz.timezone("Asia/Jakarta")
+
+HOLIDAYS_PATH = Path(os.environ.get("IDX_HOLIDAYS_PATH", "data/idx_holidays.txt"))
+
+Phase = namedtuple("Phase", "name start end")  # start/end: datetime.time, end eksklusif
+
+# Fase harian BEI. Jumat: sesi 1 lebih pendek & istirahat lebih panjang.
+_MON_THU = (
+    Phase("preopen",  dtime(8, 45),  dtime(9, 0)),
+    Phase("session1", dtime(9, 0),   dtime(12, 0)),
+    Phase("break",    dtime(12, 0),  dtime(13, 30)),
+    Phase("session2", dtime(13, 30), dtime(15, 50)),
+    Phase("preclose", dtime(15, 50), dtime(16, 1)),
+    Phase("post",     dtime(16, 1),  dtime(16, 15)),
+)
+_FRI = (
+    Phase("preopen",  dtime(8, 45),  dtime(9, 0)),
+    Phase("session1", dtime(9, 0),   dtime(11, 30)),
+    Phase("break",    dtime(11, 30), dtime(14, 0)),
+    Phase("session2", dtime(14, 0),  dtime(15, 50)),
+    Phase("preclose", dtime(15, 50), dtime(16, 1)),
+    Phase("post",     dtime(16, 1),  dtime(16, 15)),
+)
+WEEKDAY_PHASES = {0: _MON_THU, 1: _MON_THU, 2: _MON_THU, 3: _MON_THU, 4: _FRI}
+
+OPEN_PHASES = ("session1", "session2")                          # continuous trading
+ACTIVE_PHASES = ("preopen", "session1", "session2", "preclose")  # ada order masuk
+
+def load_holidays(path: Path = HOLIDAYS_PATH):
+    out = set()
+    try:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            s = line.split("#", 1)[0].strip()
+            if s:
+                out.add(date.fromisoformat(s))
+    except FileNotFoundError:
+        print(f"[CAL] file libur tidak ada: {path} (hanya Sabtu/Minggu dianggap libur)")
+    return out
+
+def _to_local(dt):
+    if dt.tzinfo is None:
+        return TZ.localize(dt)
+    return dt.astimezone(TZ)
+
+class TradingCalendar:
+    """
+    Semua hari bursa dalam rentang [first, last] dihitung sekali di awal:
+      - _days: list hari bursa urut; _idx: {date: posisi di _days}
+      - _next: {date kalender: posisi hari bursa pertama >= date}
+    Sehingga is_trading_day / next / previous N = lookup dict + slice.
+    """
+    def __init__(self, holidays=None, first=None, last=None):
+        self.holidays = set(holidays if holidays is not None else load_holidays())
+        today = datetime.now(TZ).date()
+        self.first = first or date(today.year - 2, 1, 1)
+        self.last = last or date(today.year + 1, 12, 31)
+
+        self._days, self._idx, self._next = [], {}, {}
+        d = self.first
+        while d <= self.last:
+            if d.weekday() in WEEKDAY_PHASES and d not in self.holidays:
+                self._idx[d] = len(self._days)
+                self._days.append(d)
+            d += timedelta(days=1)
+        pos = len(self._days)
+        d = self.last
+        while d >= self.first:  # mundur: posisi hari bursa berikutnya untuk tiap tanggal
+            if d in self._idx:
+                pos = self._idx[d]
+            self._next[d] = pos
+            d -= timedelta(days=1)
+
+    # ---------- hari ----------
+    def is_trading_day(self, d):
+        if isinstance(d, datetime):
+            d = _to_local(d).date()
+        return d in self._idx
+
+    def next_trading_day(self, d, include_today=True):
+        if not include_today:
+            d = d + timedelta(days=1)
+        pos = self._next.get(d)
+        if pos is None:  # di luar rentang precompute
+            pos = bisect_right(self._days, d - timedelta(days=1)) if d < self.first else len(self._days)
+        return self._days[pos] if pos < len(self._days) else None
+
+    def previous_trading_days(self, n, end, include_end=True):
+        """N hari bursa terakhir <= end (atau < end), terbaru dulu."""
+        if isinstance(end, datetime):
+            end = _to_local(end).date()
+        if not include_end:
+            end = end - timedelta(days=1)
+        if end in self._idx:
+            hi = self._idx[end] + 1
+        elif self.first <= end <= self.last:
+            hi = self._next[end]
+        else:
+            hi = bisect_right(self._days, end)
+        return self._days[max(0, hi - n):hi][::-1]
+
+    def trading_days(self, a, b):
+        """Hari bursa a..b (keduanya ikut dihitung), terlama dulu."""
+        return self._days[bisect_left(self._days, a):bisect_right(self._days, b)]
+
+    def trading_days_between(self, a, b):
+        """Jumlah hari bursa di antara a dan b (keduanya tidak dihitung)."""
+        return max(0, bisect_left(self._days, b) - bisect_right(self._days, a))
+
+    # ---------- sesi ----------
+    def phases(self, d):
+        """Fase hari d sebagai list (name, start_dt, end_dt) ber-timezone; [] bila libur."""
+        if d not in self._idx:
+            return []
+        return [(p.name,
+                 TZ.localize(datetime.combine(d, p.start)),
+                 TZ.localize(datetime.combine(d, p.end))) for p in WEEKDAY_PHASES[d.weekday()]]
+
+    def phase_at(self, dt):
+        """Nama fase saat dt ('preopen', 'session1', 'break', ...) atau None."""
+        dt = _to_local(dt)
+        d = dt.date()
+        if d not in self._idx:
+            return None
+        t = dt.time()
+        for p in WEEKDAY_PHASES[d.weekday()]:
+            if p.start <= t < p.end:
+                return p.name
+        return None
+
+    def is_open(self, dt, phases=OPEN_PHASES):
+        return self.phase_at(dt) in phases
+
+    def session_bounds(self, d, name):
+        for n, s, e in self.phases(d):
+            if n == name:
+                return s, e
+        return None
+
+    def day_end(self, d):
+        ph = self.phases(d)
+        return ph[-1][2] if ph else None
+
+    def next_session_start(self, dt, phases=OPEN_PHASES):
+        """Awal fase (default: sesi 1/2) berikutnya yang dimulai > dt (atau sedang berjalan → dt)."""
+        dt = _to_local(dt)
+        d = dt.date()
+        for _ in range(2):
+            for n, s, e in self.phases(d):
+                if n in phases and (s > dt or s <= dt < e):
+                    return max(s, dt)
+            d = self.next_trading_day(d, include_today=False)
+            if d is None:
+                return None
+        return None
+
+_CAL = None
+
+def get_calendar():
+    global _CAL
+    if _CAL is None:
+        _CAL = TradingCalendar()
+    return _CAL
@@ -0,0 +1,56 @@
+# notif/subscribers.py — registry penerima laporan snapshot (per chat id)
+import os, json
+from collections import namedtuple
+from pathlib import Path
+
+from notif.telegram import chat_ids_from_env
+
+SUBSCRIBERS_PATH = Path(os.environ.get("SUBSCRIBERS_PATH", "subscribers.json"))
+
+# seksi laporan yang tersedia di snap_once
+SECTIONS = ("gainer", "value", "rt", "powerbuy")
+
+Subscriber = namedtuple("Subscriber", "chat_id sections watchlist")
+
+def view_key(sub):
+    """Kunci tampilan: subscriber dengan kunci sama menerima render yang identik."""
+    return (sub.sections, sub.watchlist)
+
+def _norm(entry):
+    cid = str(entry.get("chat_id") or "").strip()
+    if not cid:
+        return None
+    secs = entry.get("sections") or SECTIONS
+    secs = tuple(s for s in SECTIONS if s in secs)  # urutan baku, abaikan seksi tak dikenal
+    wl = entry.get("watchlist") or ()
+    wl = frozenset(str(s).strip().upper() for s in wl if str(s).strip())
+    return Subscriber(cid, secs or SECTIONS, wl)
+
+def load_subscribers(path: Path = SUBSCRIBERS_PATH):
+    """
+    Baca subscribers.json:
+      [{"chat_id": "123", "sections": ["powerbuy"], "watchlist": ["BBCA","BBRI"]}, ...]
+    Kalau file tidak ada → semua chat id dari ENV menerima laporan lengkap.
+    """
+    entries = None
+    try:
+        if path.exists():
+            entries = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        print("[SUBS] gagal baca", path, e)
+    if not isinstance(entries, list):
+        entries = [{"chat_id": c} for c in chat_ids_from_env()]
+    out, seen = [], set()
+    for e in entries:
+        sub = _norm(e) if isinstance(e, dict) else None
+        if sub and sub.chat_id not in seen:
+            seen.add(sub.chat_id)
+            out.append(sub)
+    return out
+
+def group_by_view(subs):
+    """{view_key: [chat_id, ...]} — satu render per grup."""
+    groups = {}
+    for s in subs:
+        groups.setdefault(view_key(s), []).append(s.chat_id)
+    return groups
@@ -1,13 +1,276 @@
-import os, requests
+import os, re, time, threading, atexit
+from collections import deque
+import requests
 
 TG_TOKEN = os.environ.get("TG_TOKEN")
 TG_CHAT_ID = os.environ.get("TG_CHAT_ID")
 
-def send(text: str):
-    if not (TG_TOKEN and TG_CHAT_ID):
+# Batas Telegram Bot API
+MAX_LEN = 4096            # karakter per pesan
+PER_CHAT_INTERVAL = 1.05  # ~1 pesan/detik per chat
+GROUP_INTERVAL = 3.1      # grup/channel (id negatif): ~20 pesan/menit
+GLOBAL_RATE = 25          # < 30 pesan/detik per bot
+MAX_RETRIES = 5
+FLUSH_TIMEOUT = float(os.environ.get("TG_FLUSH_TIMEOUT", "60"))
+MAX_PENDING = int(os.environ.get("TG_MAX_PENDING", "200"))  # per chat; Telegram mati lama → buang yang tertua
+
+def chat_ids_from_env():
+    """TG_CHAT_IDS (dipisah koma) atau TG_CHAT_ID/TG_CHAT_ID1/TG_CHAT_ID2, tanpa duplikat."""
+    raw = os.environ.get("TG_CHAT_IDS")
+    cands = raw.split(",") if raw else [os.environ.get(k) for k in ("TG_CHAT_ID", "TG_CHAT_ID1", "TG_CHAT_ID2")]
+    out = []
+    for c in cands:
+        c = (c or "").strip()
+        if c and c not in out:
+            out.append(c)
+    return out
+
+def split_message(text: str, limit: int = MAX_LEN, html: bool = False):
+    """Potong teks jadi chunk <= limit, utamakan batas baris supaya tabel tidak pecah."""
+    if len(text) <= limit:
+        return [text]
+    if html:
+        return _split_html(text, limit)
+    chunks, cur, body = [], "", False   # body: cur sudah berisi baris (termasuk baris kosong)
+    for line in text.split("\n"):
+        while len(line) > limit:  # baris tunggal kepanjangan → potong keras
+            if body:
+                chunks.append(cur); cur, body = "", False
+            chunks.append(line[:limit]); line = line[limit:]
+        cand = f"{cur}\n{line}" if body else line
+        if len(cand) > limit:
+            chunks.append(cur); cur = line
+        else:
+            cur = cand
+        body = True
+    if body:
+        chunks.append(cur)
+    return chunks
+
+# parse_mode=HTML: tiap chunk harus HTML yang utuh, kalau tidak Telegram menolak (400)
+_HTML_ATOM = re.compile(r"<[^>]*>|&#?\w+;")
+_HTML_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^>]*?(/?)>")
+
+def _track_tags(stack, piece):
+    """stack baru [(nama, tag pembuka)] setelah `piece`; stack lama tidak diubah."""
+    stack = list(stack)
+    for m in _HTML_TAG.finditer(piece):
+        closing, name, selfclose = m.group(1), m.group(2).lower(), m.group(3)
+        if selfclose:
+            continue
+        if not closing:
+            stack.append((name, m.group(0)))
+            continue
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i:]
+                break
+    return stack
+
+def _close_tags(stack):
+    return "".join(f"</{name}>" for name, _ in reversed(stack))
+
+def _html_atoms(line):
+    """Tag dan entity utuh, sisanya per karakter → potong keras tidak pernah di tengah tag."""
+    pos = 0
+    for m in _HTML_ATOM.finditer(line):
+        yield from line[pos:m.start()]
+        yield m.group(0)
+        pos = m.end()
+    yield from line[pos:]
+
+def _split_html(text, limit):
+    """
+    Seperti split_message, tapi tag yang masih terbuka di batas chunk (<b>, <pre>, <a ...>)
+    ditutup di akhir chunk dan dibuka ulang di awal chunk berikutnya.
+    """
+    chunks, stack = [], []
+    cur, body = "", False   # body: cur berisi teks selain tag pembuka ulang
+
+    def emit():
+        nonlocal cur, body
+        chunks.append(cur + _close_tags(stack))
+        cur, body = "".join(tag for _, tag in stack), False
+
+    def fits(piece, new_stack):
+        return len(cur) + len(piece) + len(_close_tags(new_stack)) <= limit
+
+    for line in text.split("\n"):
+        piece = f"\n{line}" if body else line
+        ns = _track_tags(stack, line)
+        if not fits(piece, ns) and body:
+            emit()
+            piece = line
+        if fits(piece, ns):
+            cur, stack, body = cur + piece, ns, True
+            continue
+        for atom in _html_atoms(line):  # baris tunggal kepanjangan → potong keras per atom
+            ns = _track_tags(stack, atom)
+            if not fits(atom, ns) and body:
+                emit()
+            cur, stack, body = cur + atom, ns, True
+    if body:
+        chunks.append(cur + _close_tags(stack))
+    return chunks
+
+class _GlobalLimiter:
+    """Jarak minimum antar request ke satu bot (lintas semua chat)."""
+    def __init__(self, rate):
+        self._gap = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._gap
+        if slot > now:
+            time.sleep(slot - now)
+
+class _ChatWorker(threading.Thread):
+    """Satu thread per chat: urutan pesan per chat terjaga, chat lain tidak ikut menunggu."""
+    def __init__(self, owner, chat_id):
+        super().__init__(name=f"tg-{chat_id}", daemon=True)
+        self.owner = owner
+        self.chat_id = chat_id
+        self.interval = GROUP_INTERVAL if str(chat_id).startswith("-") else PER_CHAT_INTERVAL
+        self.items = deque(maxlen=MAX_PENDING)
+        self.cond = threading.Condition()
+        self.busy = False
+        self._last = 0.0
+        self._http = requests.Session()
+
+    def put(self, chunk, parse_mode):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                print(f"[WARN] Telegram {self.chat_id}: antrian penuh ({MAX_PENDING}), pesan tertua dibuang")
+            self.items.append((chunk, parse_mode))
+            self.cond.notify()
+
+    def idle(self):
+        with self.cond:
+            return not self.items and not self.busy
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.items:
+                    self.cond.wait()
+                chunk, parse_mode = self.items.popleft()
+                self.busy = True
+            try:
+                self._deliver(chunk, parse_mode)
+            finally:
+                with self.cond:
+                    self.busy = False
+
+    def _deliver(self, chunk, parse_mode):
+        body = {"chat_id": self.chat_id, "text": chunk}
+        if parse_mode:
+            body["parse_mode"] = parse_mode
+        for attempt in range(MAX_RETRIES):
+            wait = self._last + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.owner.limiter.acquire()
+            self._last = time.monotonic()
+            try:
+                r = self._http.post(self.owner.url, json=body, timeout=20)
+            except Exception as e:
+                print(f"[WARN] Telegram {self.chat_id} (try {attempt+1}/{MAX_RETRIES}):", e)
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            if r.status_code == 200:
+                return
+            if r.status_code == 429:
+                try:
+                    retry_after = float(r.json().get("parameters", {}).get("retry_after", 1))
+                except Exception:
+                    retry_after = 2 ** attempt
+                print(f"[WARN] Telegram {self.chat_id} 429, retry_after={retry_after}s")
+                time.sleep(retry_after)
+                continue
+            if r.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            print("[WARN] Telegram:", r.text)
+            return
+        print(f"[WARN] Telegram {self.chat_id}: menyerah setelah {MAX_RETRIES} percobaan")
+
+class TelegramQueue:
+    """Antrian kirim non-blocking untuk satu bot token; fan-out ke banyak chat."""
+    def __init__(self, token):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.limiter = _GlobalLimiter(GLOBAL_RATE)
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def _worker(self, chat_id):
+        with self._lock:
+            w = self._workers.get(chat_id)
+            if w is None:
+                w = self._workers[chat_id] = _ChatWorker(self, chat_id)
+                w.start()
+            return w
+
+    def submit(self, text, chat_ids, parse_mode=None):
+        # render/potong sekali, kirim ke semua chat
+        chunks = split_message(text or "", html=(parse_mode or "").upper() == "HTML")
+        # Telegram menolak pesan kosong/spasi saja (400) → jangan antre, tapi catat
+        kept = [c for c in chunks if c.strip()]
+        if not kept:
+            print(f"[TG] pesan kosong (panjang {len(text or '')}); tidak dikirim")
+            return
+        if len(kept) < len(chunks):
+            print(f"[TG] {len(chunks) - len(kept)} chunk berisi spasi saja dilewati")
+        chunks = kept
+        for cid in chat_ids:
+            w = self._worker(str(cid))
+            for c in chunks:
+                w.put(c, parse_mode)
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """Tunggu sampai semua antrian kosong (atau timeout). Return True bila tuntas."""
+        end = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                workers = list(self._workers.values())
+            if all(w.idle() for w in workers):
+                return True
+            if time.monotonic() >= end:
+                return False
+            time.sleep(0.05)
+
+_QUEUES = {}
+_QLOCK = threading.Lock()
+
+def get_queue(token=None):
+    token = token or TG_TOKEN
+    with _QLOCK:
+        q = _QUEUES.get(token)
+        if q is None:
+            q = _QUEUES[token] = TelegramQueue(token)
+        return q
+
+def send(text: str, chat_ids=None, parse_mode=None, token=None):
+    """Masukkan pesan ke antrian lalu langsung kembali; pengiriman di thread latar."""
+    token = token or TG_TOKEN
+    chat_ids = chat_ids if chat_ids is not None else chat_ids_from_env()
+    if not (token and chat_ids):
         print(text)
         return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    r = requests.post(url, json={"chat_id": TG_CHAT_ID, "text": text}, timeout=12)
-    if r.status_code != 200:
-        print("[WARN] Telegram:", r.text)
+    get_queue(token).submit(text, chat_ids, parse_mode=parse_mode)
+
+def flush(timeout=FLUSH_TIMEOUT):
+    """Tunggu semua antrian (semua bot) dengan satu batas waktu bersama."""
+    end = time.monotonic() + timeout
+    with _QLOCK:
+        queues = list(_QUEUES.values())
+    ok = True
+    for q in queues:
+        ok = q.flush(max(0.0, end - time.monotonic())) and ok
+    return ok
+
+# job one-shot (snap_once, bandar_nightly) jangan keluar sebelum antrian terkirim
+atexit.register(flush)
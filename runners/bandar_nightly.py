@@ -1,13 +1,17 @@
 # runners/bandar_nightly.py
 import os, json, csv, time
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-import pytz
-import requests
 
 from auth.screener_capture import get_screener_results_by_name
+from notif import telegram as tg
+from logic.trading_calendar import get_calendar, TZ
+from logic.class_history import ClassHistory
+from logic.config import bandar_settings
+from logic.parse_pool import get_pool, akumulasi_from_bytes
+from logic.parsers import parse_akumulasi as _parse_akumulasi  # nama lama (bench, backtest)
 
-TZ = pytz.timezone("Asia/Jakarta")
+CAL = get_calendar()
 
 DATA_DIR = Path("data/bandar")
 RAW_DIR = DATA_DIR / "raw"
@@ -17,33 +21,7 @@ RAW_DIR.mkdir(parents=True, exist_ok=True)
 TG_TOKEN = os.environ.get("TG_TOKEN_BANDAR") or os.environ.get("TG_TOKEN")
 TG_CHAT_ID3 = os.environ.get("TG_CHAT_ID3") or os.environ.get("BANDAR_TG_CHAT_ID")
 
-MAX_SYMBOLS = 20
-ROLLING_DAYS = 5
-
-
-CAPTURE_NAME = os.environ.get("BANDAR_SCREENER_NAME", "akum ihsg")
-CAPTURE_TEMPLATE_ID = int(os.environ.get("BANDAR_TEMPLATE_ID", "4272542"))
-CAPTURE_DEBUG = os.environ.get("BANDAR_DEBUG") == "1"
-
-# ...
-meta = None
-for i in range(1 + CAPTURE_RETRIES):
-    try:
-        meta = get_screener_results_by_name(
-            name=CAPTURE_NAME,
-            headless=True,
-            timeout_ms=CAPTURE_TIMEOUT_MS,
-            template_id=CAPTURE_TEMPLATE_ID,
-            per_page=2000,
-            debug=CAPTURE_DEBUG,
-            debug_dir=str(RAW_DIR),
-        )
-        break
-    except Exception as e:
-        print(f"[BANDAR] capture error (try {i+1}/{1+CAPTURE_RETRIES}):", e)
-        time.sleep(RETRY_SLEEP)
-
-
+# ukuran laporan, rolling & capture: blok bandar di config.yaml (logic.config.bandar_settings)
 
 def now_id(): return datetime.now(TZ)
 
@@ -54,19 +32,21 @@ def _read_json(path: Path, default=None):
     try: return json.loads(path.read_text(encoding="utf-8"))
     except Exception: return default
 
+def _save_raw_meta(path: Path, meta):
+    """Seperti _save_json; data berupa bytes mentah (direct API) ditempel apa adanya tanpa decode ulang."""
+    data = meta.get("data")
+    if not isinstance(data, (bytes, bytearray)):
+        _save_json(path, meta)
+        return
+    head = json.dumps({k: v for k, v in meta.items() if k != "data"}, ensure_ascii=False)
+    sep = b", " if len(head) > 2 else b""
+    path.write_bytes(head[:-1].encode("utf-8") + sep + b'"data": ' + bytes(data) + b"}")
+
 def _send_tg(text: str):
     if not TG_TOKEN or not TG_CHAT_ID3:
         print("[BANDAR]", text); return
-    try:
-        r = requests.post(
-            f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage",
-            json={"chat_id": TG_CHAT_ID3, "text": text, "parse_mode": "HTML"},
-            timeout=20,
-        )
-        if r.status_code != 200:
-            print("[BANDAR WARN]", r.text)
-    except Exception as e:
-        print("[BANDAR ERR]", e)
+    # non-blocking: antrian notif.telegram yang mengurus chunking, rate limit & retry 429
+    tg.send(text, chat_ids=[TG_CHAT_ID3], parse_mode="HTML", token=TG_TOKEN)
 
 def _classify(x):
     try: v = float(x)
@@ -82,61 +62,6 @@ def _classify(x):
     if 0 < v < 10: return "NA"
     return "nan"
 
-def _norm_symbol(x):
-    if not x: return None
-    s = str(x).strip().upper()
-    return "".join(ch for ch in s if ch.isalnum())
-
-def _parse_akumulasi(resp):
-    out = []
-    def _try_rows(rows):
-        nonlocal out
-        if not isinstance(rows, list): return
-        if rows and isinstance(rows[0], dict):
-            for r in rows:
-                sym = _norm_symbol(r.get("symbol") or r.get("code") or r.get("stock") or r.get("ticker"))
-                if not sym: continue
-                val = r.get("value")
-                if val is None:
-                    val = r.get("akum") or r.get("accum") or r.get("score") or r.get("C") or r.get("c")
-                try: out.append({"symbol": sym, "value": float(val)})
-                except Exception: continue
-    def _try_table(columns, rows):
-        nonlocal out
-        if not isinstance(columns, list) or not isinstance(rows, list): return
-        cols = [str(c).lower() for c in columns]
-        try: i_sym = next(i for i,c in enumerate(cols) if c in ("symbol","code","stock","ticker"))
-        except StopIteration: return
-        cand_vals = ("value","akum","accum","score","c")
-        i_val = next((cols.index(k) for k in cand_vals if k in cols), None)
-        if i_val is None: return
-        for row in rows:
-            if not isinstance(row, (list, tuple)) or len(row) <= max(i_sym, i_val): continue
-            sym = _norm_symbol(row[i_sym]); 
-            if not sym: continue
-            try: out.append({"symbol": sym, "value": float(row[i_val])})
-            except Exception: continue
-
-    if isinstance(resp, dict):
-        d = resp.get("data") or {}
-        if isinstance(d.get("columns"), list) and isinstance(d.get("rows"), list): _try_table(d["columns"], d["rows"])
-        if isinstance(d.get("rows"), list): _try_rows(d["rows"])
-        if isinstance(d.get("data"), list): _try_rows(d["data"])
-        for key in ("rows","items","list","data"):
-            v = resp.get(key)
-            if isinstance(v, list): _try_rows(v)
-    elif isinstance(resp, list):
-        for r in resp:
-            if isinstance(r, dict):
-                sym = _norm_symbol(r.get("symbol") or r.get("code") or r.get("stock") or r.get("ticker"))
-                if not sym: continue
-                val = r.get("value") or r.get("akum") or r.get("accum") or r.get("score") or r.get("C") or r.get("c")
-                try: out.append({"symbol": sym, "value": float(val)})
-                except Exception: continue
-
-    uniq = {r["symbol"]: r["value"] for r in out}
-    return [{"symbol": s, "value": v} for s, v in uniq.items()]
-
 def _save_csv_daily(day_path_csv: Path, rows):
     with day_path_csv.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -145,11 +70,12 @@ def _save_csv_daily(day_path_csv: Path, rows):
             w.writerow([r["symbol"], r["value"], _classify(r["value"])])
 
 def _date_range_last_n(n_days: int, end_date: datetime):
-    return [(end_date - timedelta(days=i)).date().isoformat() for i in range(n_days)]
+    """N hari BURSA terakhir s/d end_date (akhir pekan & libur BEI dilewati)."""
+    return [d.isoformat() for d in CAL.previous_trading_days(n_days, end_date.date())]
 
 def _sum_rolling_5d():
     today = now_id()
-    dates = _date_range_last_n(ROLLING_DAYS, today)
+    dates = _date_range_last_n(bandar_settings().rolling_days, today)
     acc = {}
     for ds in dates:
         rows = _read_json(DATA_DIR / f"{ds}.json", default=[])
@@ -164,42 +90,72 @@ def _sum_rolling_5d():
     out.sort(key=lambda x: x["total_value"], reverse=True)
     return out
 
+def _backfill_history(hist, today, days=30):
+    """Riwayat kosong (pertama kali) → isi dari file harian yang sudah ada, sekali saja."""
+    for d in reversed(CAL.previous_trading_days(days, today.date(), include_end=False)):
+        rows = _read_json(DATA_DIR / f"{d.isoformat()}.json", default=None)
+        if isinstance(rows, list) and rows:
+            hist.update(d.isoformat(), {r["symbol"]: _classify(r.get("value")) for r in rows if r.get("symbol")})
+
+def _history_sections(hist, ds):
+    cfg = bandar_settings()
+    def _fmt(syms):
+        more = f" (+{len(syms) - cfg.max_section})" if len(syms) > cfg.max_section else ""
+        return ", ".join(syms[:cfg.max_section]) + more
+    out = []
+    new3 = hist.new_3ba(ds)
+    new2 = [s for s in hist.new_accumulation(ds) if s not in new3]
+    streak = hist.acc_streak_at_least(cfg.streak_min)
+    flip = hist.flipped_to_distribution(ds)
+    out += ["", f"🆕 Baru 3BA hari ini ({len(new3)}): " + (_fmt(new3) if new3 else "-")]
+    out += [f"🆕 Baru 2BA hari ini ({len(new2)}): " + (_fmt(new2) if new2 else "-")]
+    out += [f"🔁 Streak 2BA+ ≥{cfg.streak_min} hari ({len(streak)}): "
+            + (_fmt([f"{s}({n})" for s, n in streak]) if streak else "-")]
+    out += [f"⚠️ Flip ke distribusi ({len(flip)}): " + (_fmt(flip) if flip else "-")]
+    return out
+
 def main():
+    if not CAL.is_trading_day(now_id().date()):
+        print("[BANDAR] bukan hari bursa; capture dilewati.")
+        return
     ds = now_id().date().isoformat()
     day_json = DATA_DIR / f"{ds}.json"
     day_csv  = DATA_DIR / f"{ds}.csv"
     raw_json = RAW_DIR / f"{ds}.raw.json"
+    cfg = bandar_settings()
 
     meta = None
-    for i in range(1 + CAPTURE_RETRIES):
+    for i in range(1 + cfg.retries):
         try:
             meta = get_screener_results_by_name(
-                name=CAPTURE_NAME,
+                name=cfg.screener_name,
                 headless=True,
-                timeout_ms=CAPTURE_TIMEOUT_MS,
-                template_id=CAPTURE_TEMPLATE_ID,
-                per_page=2000,
-                debug=CAPTURE_DEBUG,
+                timeout_ms=cfg.timeout_ms,
+                template_id=cfg.template_id,
+                per_page=cfg.per_page,
+                debug=cfg.debug,
                 debug_dir=str(RAW_DIR),
+                raw=True,
             )
             break
         except Exception as e:
-            print(f"[BANDAR] capture error (try {i+1}/{1+CAPTURE_RETRIES}):", e)
-            time.sleep(RETRY_SLEEP)
+            print(f"[BANDAR] capture error (try {i+1}/{1+cfg.retries}):", e)
+            time.sleep(cfg.retry_sleep_sec)
     if not meta:
         _send_tg("⚠️ Bandar Nightly: gagal menangkap hasil screener (Akum IHSG).")
         return
 
     resp = meta.get("data")
-    _save_json(raw_json, meta)
-
-    rows = _parse_akumulasi(resp)
+    # ±2000 baris screener: decode + parse di logic.parse_pool; mode thread/process → berjalan selama raw disimpan
+    fut = get_pool().submit(akumulasi_from_bytes, resp)
+    _save_raw_meta(raw_json, meta)
+    rows = fut.result()
     print(f"[BANDAR] parsed rows = {len(rows)} (source: {meta.get('_source')})")
 
     if not rows:
         _send_tg("⚠️ Bandar Nightly: data kosong dari screener. File harian tidak diupdate.")
         roll = _sum_rolling_5d()
-        _save_json(DATA_DIR / "rolling_5d.json", {"date": ds, "top": roll[:MAX_SYMBOLS], "count_all": len(roll)})
+        _save_json(DATA_DIR / "rolling_5d.json", {"date": ds, "top": roll[:cfg.max_symbols], "count_all": len(roll)})
         return
 
     _save_json(day_json, rows)
@@ -212,9 +168,9 @@ def main():
 
     roll = _sum_rolling_5d()
     filt = [r for r in roll if _class_today(r["symbol"]) in ("3BA","2BA")]
-    top = filt[:MAX_SYMBOLS]
+    top = filt[:cfg.max_symbols]
 
-    title = f"📊 Bandar Accumulation 5D (per {ds}) — 3BA & 2BA (Top {MAX_SYMBOLS})"
+    title = f"📊 Bandar Accumulation {cfg.rolling_days}D (per {ds}) — 3BA & 2BA (Top {cfg.max_symbols})"
     lines = [title, ""]
     if not top:
         lines.append("(tidak ada 3BA/2BA hari ini)")
@@ -222,6 +178,14 @@ def main():
         for i, r in enumerate(top, 1):
             sym = r["symbol"]; tot = r["total_value"]; cls = _class_today(sym)
             lines.append(f"{i}. {sym:<6} {tot:+.2f}  [{cls}]")
+
+    # --- transisi & streak (indeks inkremental; tanpa capture tambahan)
+    hist = ClassHistory(DATA_DIR / "class_history.json")
+    if hist.last_date is None:
+        _backfill_history(hist, now_id())
+    if hist.update(ds, {sym: _classify(v) for sym, v in today_map.items()}):
+        hist.save()
+    lines += _history_sections(hist, ds)
     _send_tg("\n".join(lines))
 
     _save_json(DATA_DIR / "rolling_5d.json", {"date": ds, "top": top, "count_all": len(roll)})
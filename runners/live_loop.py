@@ -1,10 +1,42 @@
-import time
+from runners import snap_once
 from runners.snap_once import run
+from auth.stockbit_login import BrowserUnavailable
+from notif.telegram import send as tg_send
+from logic.trading_calendar import get_calendar, ACTIVE_PHASES
+from logic.clock import get_clock
+from logic.profiling import LoopProfiler
+from logic.bounded import SessionState, MemoryGuard
+from logic.checkpoint import Checkpoint
+
+CAL = get_calendar()
+PROF = LoopProfiler("live_loop")
+# state antar snapshot (dedup kirim, PowerBuy terakhir): reset harian + dipangkas MemoryGuard
+STATE = snap_once.register_state(SessionState())
+MEM = MemoryGuard(STATE)
+CKPT = Checkpoint("live_loop")
+CKPT.register("snapshot", snap_once.checkpoint_state, snap_once.restore_state)
 
 if __name__ == "__main__":
+    CKPT.restore()
     while True:
+        now = get_clock().now()
+        STATE.check(now)
+        MEM.check()
+        if not CAL.is_open(now, phases=ACTIVE_PHASES):
+            snap_once.flush_prices()   # akhir sesi → harga ke data/prices (no-op bila tak ada yang baru)
+            # bursa tutup (istirahat/libur/malam) → tidur sampai fase aktif berikutnya
+            nxt = CAL.next_session_start(now, phases=ACTIVE_PHASES)
+            if not nxt:
+                break
+            get_clock().sleep(min(max(1.0, (nxt - now).total_seconds()), 3600))
+            continue
         try:
-            run()
+            with PROF.iteration():
+                run()
+        except BrowserUnavailable as e:
+            tg_send(f"[live_loop] token ditolak dan login ulang tidak bisa di host ini ({e}); loop berhenti.")
+            break
         except Exception as e:
             print("ERROR:", e)
-        time.sleep(2)
+        CKPT.maybe_save()
+        get_clock().sleep(2)
@@ -1,77 +1,155 @@
-import time, datetime, pytz
+import datetime
 from notif.telegram import send as tg_send
+from runners import snap_once
 from runners.snap_once import run as run_snapshot
+from clients import stockbit
+from auth.stockbit_login import BrowserUnavailable
+from logic.trading_calendar import get_calendar, TZ
+from logic.cadence import get_cadence
+from logic.clock import get_clock
+from logic import metrics
+from logic.checkpoint import Checkpoint
 
-TZ = pytz.timezone("Asia/Jakarta")
+CAL = get_calendar()
+CADENCE = get_cadence("snapshot")
+_last_gainers = None
+_planned = None   # waktu terjadwal tick yang sedang/terakhir dijalankan (dasar jadwal & lateness)
 
-# Sesi pasar
-MORNING_START = (9, 0)
-MORNING_END   = (12, 0)
-AFTER_START   = (13, 30)
-AFTER_END     = (16, 15)
+# warm restart: job pengganti di sesi yang sama melanjutkan state ini (lihat logic.checkpoint)
+CKPT = Checkpoint("market_loop")
+
+def _set_last_gainers(v):
+    global _last_gainers
+    _last_gainers = v
+
+CKPT.register("cadence", CADENCE.dump_state, CADENCE.load_state)
+CKPT.register("last_gainers", lambda: _last_gainers, _set_last_gainers)
+CKPT.register("snapshot", snap_once.checkpoint_state, snap_once.restore_state)
 
 def now_id():
-    return datetime.datetime.now(TZ)
+    return get_clock().now()
 
-def _dt(hour, minute):
-    n = now_id()
-    return TZ.localize(datetime.datetime(n.year, n.month, n.day, hour, minute, 0))
+def _windows(day):
+    """Jendela kirim per hari bursa: sesi 1, lalu sesi 2 s/d akhir post-trading (16:15)."""
+    ph = {name: (s, e) for name, s, e in CAL.phases(day)}
+    if not ph:
+        return []
+    return [ph["session1"], (ph["session2"][0], ph["post"][1])]
 
 def current_session():
     """Return (start_dt, end_dt) untuk sesi yang sedang berjalan; else None."""
     n = now_id()
-    s1, e1 = _dt(*MORNING_START), _dt(*MORNING_END)
-    s2, e2 = _dt(*AFTER_START), _dt(*AFTER_END)
-    if s1 <= n < e1:
-        return s1, e1
-    if s2 <= n < e2:
-        return s2, e2
+    for s, e in _windows(n.date()):
+        if s <= n < e:
+            return s, e
     return None
 
-def next_tick(now):
-    """Irama kirim: <10:00 tiap 2 menit, >=10:00 tiap 10 menit, batas sesi."""
-    s, e = current_session()
-    if not s:
+def next_tick(planned, now):
+    """
+    Tick terjadwal berikutnya = tick terjadwal sebelumnya + interval adaptif (logic.cadence), dibatasi akhir sesi.
+    Jadwal tidak bergeser oleh durasi snapshot; slot yang sudah lewat seluruhnya dilompati (dihitung).
+    """
+    sess = current_session()
+    if not sess:
         return None
-    if now < _dt(10, 0):
-        step = 2
-        base_min = (now.minute // 2) * 2
-        base = TZ.localize(datetime.datetime(now.year, now.month, now.day, now.hour, base_min, 0))
-        nxt = base + datetime.timedelta(minutes=step)
-    else:
-        step = 10
-        base_min = (now.minute // 10) * 10
-        base = TZ.localize(datetime.datetime(now.year, now.month, now.day, now.hour, base_min, 0))
-        nxt = base + datetime.timedelta(minutes=step)
+    s, e = sess
+    iv = datetime.timedelta(seconds=CADENCE.next_interval(now))
+    nxt = (planned if planned and planned >= s else now) + iv
+    skipped = 0
+    while nxt + iv <= now:
+        nxt += iv
+        skipped += 1
+    if skipped:
+        metrics.inc("ticks_skipped", skipped, runner="market_loop")
     return min(nxt, e)
 
+def tick_lateness(now):
+    """Detik keterlambatan mulai snapshot terhadap jadwalnya (0 bila belum ada jadwal)."""
+    return max(0.0, (now - _planned).total_seconds()) if _planned else 0.0
+
+def _snapshot():
+    """Jalankan snapshot & umpankan sinyal (laju trade, churn Top Gainer, error/429) ke cadence."""
+    global _last_gainers
+    try:
+        model = run_snapshot() or {}
+    except Exception as e:
+        CADENCE.observe_result(ok=False, throttled=stockbit.is_throttled(e))
+        raise
+    # stage gagal di laporan parsial tetap memperlambat irama
+    CADENCE.observe_result(ok=not model.get("errors"), throttled=model.get("throttled", False))
+    # laju trade = isi tape RT / rentang jam yang dicakupnya (tape penuh dalam 10 detik → pasar ramai)
+    n_rt = model.get("rt_items") or 0
+    if n_rt > 1:
+        CADENCE.observe_trades(n_rt, max(float(model.get("rt_span_sec") or 0), 1.0))
+    cur = [g["symbol"] for g in model.get("gainers", [])]
+    CADENCE.observe_ranks(_last_gainers, cur)
+    _last_gainers = cur
+
+def _stop_no_browser(e):
+    """Bearer ditolak (dicabut/kedaluwarsa) dan host tanpa browser → berhenti bersih, bukan error tiap tick."""
+    CKPT.maybe_save(force=True)
+    tg_send(f"[market_loop] token ditolak dan login ulang tidak bisa di host ini ({e}); loop berhenti. "
+            f"Perbarui secret STOCKBIT_BEARER atau jalankan ulang workflow.")
+
 def sleep_until(dt):
     while True:
         d = (dt - now_id()).total_seconds()
         if d <= 0: return
-        time.sleep(min(d, 15))
+        get_clock().sleep(min(d, 15))
 
 def main():
-    # snapshot awal saat job dimulai (08:55/13:30) lalu lanjut sesuai irama
-    try:
-        run_snapshot()
-    except Exception as e:
-        tg_send(f"[market_loop] snapshot awal error: {e}")
+    global _planned
+    today = now_id().date()
+    if not CAL.is_trading_day(today):
+        print(f"[market_loop] {today} bukan hari bursa; selesai.")
+        return
+    metrics.start_http_server()
+    CKPT.restore()
+    # snapshot awal saat job dimulai (08:55/13:30) lalu lanjut sesuai irama;
+    # pulih dari checkpoint yang masih segar → snapshot terakhir belum basi, tunggu tick berikutnya
+    _planned = now_id()
+    age = CKPT.age()
+    if age is None or age >= CADENCE.next_interval(now_id()):
+        try:
+            _snapshot()
+        except BrowserUnavailable as e:
+            _stop_no_browser(e)
+            return
+        except Exception as e:
+            tg_send(f"[market_loop] snapshot awal error: {e}")
+        CKPT.maybe_save(force=True)
 
     while True:
         sess = current_session()
         if not sess:
-            # di luar sesi -> selesai (biarkan cron sesi berikutnya yang memulai lagi)
-            break
-        nxt = next_tick(now_id())
+            snap_once.flush_prices()   # snapshot terakhir sesi ini → harga ke data/prices
+            # istirahat siang → tidur sampai sesi berikutnya hari ini; selain itu selesai
+            nxt = CAL.next_session_start(now_id())
+            if not nxt or nxt.date() != today:
+                break
+            sleep_until(nxt)
+            _planned = nxt
+            continue
+        nxt = next_tick(_planned, now_id())
         if not nxt:
             break
         sleep_until(nxt)
+        _planned = nxt
+        late = tick_lateness(now_id())
+        metrics.observe("tick_lateness_seconds", late, runner="market_loop")
+        metrics.set_gauge("tick_lateness_last_seconds", round(late, 3), runner="market_loop")
         try:
-            run_snapshot()
+            _snapshot()
+        except BrowserUnavailable as e:
+            _stop_no_browser(e)
+            break
         except Exception as e:
             tg_send(f"[market_loop] snapshot error: {e}")
-        time.sleep(1)
+        CKPT.maybe_save(force=True)
+        metrics.write_textfile()
+
+    snap_once.flush_prices()
+    print("[market_loop] metrics summary →", metrics.write_summary("market_loop"))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+"""
+Runner: server tiruan API Stockbit (exodus) untuk load test & benchmark offline.
+
+  python -m runners.mock_stockbit --port 8765 --profile degraded
+  export STOCKBIT_BASE_URL=http://127.0.0.1:8765
+  export STOCKBIT_BEARER=$(python -m runners.mock_stockbit --mint-token)
+
+Payload: rekaman di data/fixtures (lihat logic.fixtures) atau sintetis.
+Bearer "expired" (atau token dengan exp lewat) → 401. Statistik: GET /_mock/stats
+"""
+
+import argparse, base64, json, random, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from logic import fixtures
+from logic.clock import get_clock
+
+# latensi (ms) rata-rata ± jitter, peluang 5xx, peluang 429, peluang 401 acak
+PROFILES = {
+    "ideal":     {"latency_ms": 0,   "jitter_ms": 0,   "error_rate": 0.0,   "throttle_rate": 0.0,  "auth_error_rate": 0.0},
+    "normal":    {"latency_ms": 80,  "jitter_ms": 40,  "error_rate": 0.005, "throttle_rate": 0.0,  "auth_error_rate": 0.0},
+    "degraded":  {"latency_ms": 400, "jitter_ms": 300, "error_rate": 0.05,  "throttle_rate": 0.05, "auth_error_rate": 0.01},
+    "throttled": {"latency_ms": 120, "jitter_ms": 60,  "error_rate": 0.0,   "throttle_rate": 0.3,  "auth_error_rate": 0.0},
+}
+
+def mint_token(exp_in_sec=12 * 3600):
+    """JWT tiruan (tanpa signature valid) dengan exp, cukup untuk auth.stockbit_login._decode_jwt_exp."""
+    def b64(o):
+        return base64.urlsafe_b64encode(json.dumps(o).encode()).decode().rstrip("=")
+    return f"{b64({'alg': 'none', 'typ': 'JWT'})}.{b64({'exp': int(time.time()) + exp_in_sec, 'sub': 'mock'})}.mock"
+
+def _token_expired(bearer):
+    if bearer == "expired":
+        return True
+    try:
+        body = bearer.split(".")[1] + "==="
+        exp = json.loads(base64.urlsafe_b64decode(body)).get("exp")
+        return exp is not None and int(exp) < time.time()
+    except Exception:
+        return False
+
+class MockState:
+    def __init__(self, profile, root, seed=0):
+        self.p = dict(profile)
+        self.root = root
+        self.rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}   # path -> {status: n}
+        self.t0 = time.time()
+        self.trade_seq = 0
+
+    def roll(self, key):
+        with self.lock:
+            return self.rnd.random() < self.p[key]
+
+    def delay(self):
+        with self.lock:
+            d = self.p["latency_ms"] + self.rnd.uniform(-1, 1) * self.p["jitter_ms"]
+        if d > 0:
+            time.sleep(d / 1000.0)
+
+    def count(self, path, status):
+        with self.lock:
+            by = self.counts.setdefault(path, {})
+            by[str(status)] = by.get(str(status), 0) + 1
+
+    def next_trades(self, n):
+        with self.lock:
+            start = self.trade_seq
+            self.trade_seq += n
+        return fixtures.payload("running_trade", root=self.root, n=n, seed=start, start_id=start)
+
+def _route(state, method, path, q, body):
+    """(status, payload) untuk path API."""
+    hhmm = get_clock().now().strftime("%H%M")  # jam bursa (WIB), bukan jam host — runner CI berjalan di UTC
+    if path == "/order-trade/market-mover":
+        mt = (q.get("mover_type") or [""])[0]
+        name = "top_value" if "VALUE" in mt else "top_gainer"
+        return 200, fixtures.payload(name, hhmm=hhmm, root=state.root, seed=int(time.time() - state.t0) // 60)
+    if path == "/order-trade/running-trade":
+        limit = int((q.get("limit") or ["50"])[0])
+        rec = fixtures.load_fixture("running_trade", hhmm=hhmm, root=state.root)
+        return 200, rec if rec is not None else state.next_trades(limit)
+    if path == "/order-trade/powerbuy":
+        sym = (q.get("symbol") or ["BBCA"])[0]
+        return 200, fixtures.payload("powerbuy", hhmm=hhmm, symbol=sym, root=state.root)
+    if path == "/screener/results":
+        per_page = int((q.get("per_page") or [body.get("per_page", 2000)])[0])
+        return 200, fixtures.payload("screener", root=state.root, n=per_page)
+    return 404, {"message": f"unknown path {path}"}
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):  # senyap; statistik ada di /_mock/stats
+            pass
+
+        def _reply(self, status, obj, headers=None):
+            raw = json.dumps(obj, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _handle(self, method):
+            u = urlparse(self.path)
+            q = parse_qs(u.query)
+            body = {}
+            n = int(self.headers.get("Content-Length") or 0)
+            if n:
+                try:
+                    body = json.loads(self.rfile.read(n) or b"{}")
+                except Exception:
+                    body = {}
+            if u.path == "/_mock/stats":
+                return self._reply(200, {"profile": state.p, "counts": state.counts,
+                                         "uptime_sec": round(time.time() - state.t0, 1)})
+
+            state.delay()
+            bearer = (self.headers.get("Authorization") or "").replace("Bearer ", "", 1).strip()
+            if not bearer or _token_expired(bearer) or state.roll("auth_error_rate"):
+                status, obj, hdr = 401, {"message": "UNAUTHORIZED"}, None
+            elif state.roll("throttle_rate"):
+                status, obj, hdr = 429, {"message": "Too Many Requests"}, {"Retry-After": "1"}
+            elif state.roll("error_rate"):
+                status, obj, hdr = 503, {"message": "Service Unavailable"}, None
+            else:
+                status, obj = _route(state, method, u.path, q, body if isinstance(body, dict) else {})
+                hdr = None
+            state.count(u.path, status)
+            self._reply(status, obj, hdr)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+    return Handler
+
+def serve(host="127.0.0.1", port=8765, profile="normal", root=fixtures.FIXTURE_DIR, seed=0, **overrides):
+    """Start server di thread latar; return (server, state). server.shutdown() untuk berhenti."""
+    prof = dict(PROFILES[profile])
+    prof.update({k: v for k, v in overrides.items() if v is not None})
+    state = MockState(prof, Path(root), seed=seed)
+    srv = ThreadingHTTPServer((host, port), make_handler(state))
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, name="mock-stockbit", daemon=True).start()
+    return srv, state
+
+def main():
+    ap = argparse.ArgumentParser(description="Server tiruan API Stockbit")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="normal")
+    ap.add_argument("--fixtures", default=str(fixtures.FIXTURE_DIR))
+    ap.add_argument("--latency-ms", type=float)
+    ap.add_argument("--jitter-ms", type=float)
+    ap.add_argument("--error-rate", type=float)
+    ap.add_argument("--throttle-rate", type=float)
+    ap.add_argument("--auth-error-rate", type=float)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--mint-token", action="store_true", help="cetak bearer tiruan lalu keluar")
+    args = ap.parse_args()
+
+    if args.mint_token:
+        print(mint_token())
+        return
+
+    srv, state = serve(args.host, args.port, args.profile, args.fixtures, args.seed,
+                       latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate, auth_error_rate=args.auth_error_rate)
+    print(f"[MOCK] listening on http://{args.host}:{args.port} profile={args.profile} {state.p}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+if __name__ == "__main__":
+    main()
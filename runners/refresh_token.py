@@ -1,31 +1,66 @@
 """
 Runner: Refresh Stockbit Token
 Dipakai untuk memperbarui token (bearer) secara otomatis.
+
+Jalur cepat (token-only): bila bearer di token.json / STOCKBIT_BEARER masih berlaku
+>= --min-valid detik, login (Playwright + Chromium) dilewati sama sekali.
+
+  python -m runners.refresh_token                       # login hanya bila perlu
+  python -m runners.refresh_token --force               # paksa login ulang
+  python -m runners.refresh_token --check --min-valid 900
+      # tanpa login; tulis needs_browser=true|false ke $GITHUB_OUTPUT (untuk step workflow bersyarat)
 """
 
-import json
-from pathlib import Path
-from auth.stockbit_login import login_and_capture_token
+import argparse, os, sys
+from datetime import datetime
+from auth.stockbit_login import token_status, get_bearer_token, TOKEN_PATH
+from logic.trading_calendar import get_calendar, TZ
 
-TOKEN_PATH = Path("token.json")
+# default: cukup untuk satu hari bursa penuh (08:55 → 16:15)
+MIN_VALID_SEC = int(os.environ.get("REFRESH_MIN_VALID_SEC", str(8 * 3600)))
 
-def main():
-    print("[REFRESH] Memulai proses refresh token...")
+def _github_output(**kv):
+    path = os.environ.get("GITHUB_OUTPUT")
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        for k, v in kv.items():
+            f.write(f"{k}={v}\n")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Refresh bearer Stockbit")
+    ap.add_argument("--force", action="store_true", help="login ulang walau token masih berlaku")
+    ap.add_argument("--check", action="store_true", help="hanya cek; tidak pernah login")
+    ap.add_argument("--min-valid", type=int, default=MIN_VALID_SEC, help="sisa umur token minimum (detik)")
+    args = ap.parse_args(argv)
+
+    tok, left = token_status()
+    valid = bool(tok) and left >= args.min_valid
+    if args.check:
+        print(f"[REFRESH] token {'berlaku' if valid else 'perlu login'} (sisa {max(left, 0) / 3600:.1f} jam)")
+        _github_output(needs_browser="false" if valid else "true")
+        return 0
 
-    # Login ulang ke Stockbit → dapatkan bearer token baru
+    today = datetime.now(TZ).date()
+    if not get_calendar().is_trading_day(today):
+        print(f"[REFRESH] {today} bukan hari bursa; login dilewati.")
+        return 0
+
+    if valid and not args.force:
+        print(f"[REFRESH] token masih berlaku {left / 3600:.1f} jam; login dilewati (tanpa browser).")
+        return 0
+
+    print("[REFRESH] Memulai proses refresh token...")
+    # Login ulang ke Stockbit → bearer baru (disimpan ke token.json oleh auth.stockbit_login)
     try:
-        new_tok = login_and_capture_token(headless=True)
+        new_tok = get_bearer_token(headless=True, force_refresh=True)
     except Exception as e:
         print(f"[REFRESH ERROR] Gagal login: {e}")
-        return
+        return 0  # preflight: jangan gagalkan job; loop masih bisa refresh saat 401
 
-    if not new_tok or "token" not in new_tok:
-        print("[REFRESH ERROR] Tidak ada token baru yang didapat.")
-        return
+    _, left = token_status()
+    print(f"[REFRESH] Token baru berhasil disimpan ke {TOKEN_PATH} (len={len(new_tok)}, sisa {left / 3600:.1f} jam)")
+    return 0
 
-    # Simpan ke file token.json
-    try:
-        TOKEN_PATH.write_text(json.dumps(new_tok, indent=2))
-        print(f"[REFRESH] Token baru berhasil disimpan ke {TOKEN_PATH}")
-        print(f"[REFRESH] Expired at: {new_tok.get('exp')}")
-    except Exception as e
+if __name__ == "__main__":
+    sys.exit(main())
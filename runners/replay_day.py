@@ -0,0 +1,167 @@
+"""
+Runner: replay satu hari bursa penuh dengan waktu virtual.
+market_loop dijalankan apa adanya, tapi endpoint Stockbit diganti rekaman
+(data/fixtures, fallback sintetis) dan Telegram hanya dihitung.
+
+  python -m runners.replay_day --date 2026-10-16              # secepat mungkin
+  python -m runners.replay_day --speed 100 --latency-ms 250    # 100x, latensi API simulasi
+"""
+
+import argparse, json, time
+from datetime import datetime, time as dtime
+from pathlib import Path
+
+from logic import fixtures
+from logic.clock import VirtualClock, set_clock, get_clock
+from logic.trading_calendar import get_calendar, TZ
+from clients import stockbit
+from logic.rt_ring import RingReader
+from runners import snap_once, market_loop
+
+OUT_DIR = Path("data/replay")
+
+_SESSION_OF = {"preopen": "session1", "session1": "session1", "break": "break",
+               "session2": "session2", "preclose": "session2", "post": "session2"}
+
+def _pct(xs, q):
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+class Recorder:
+    def __init__(self, latency_ms=0.0, root=fixtures.FIXTURE_DIR):
+        self.latency = latency_ms / 1000.0
+        self.root = root
+        self.requests = {}   # session -> endpoint -> n
+        self.ticks = []      # {session, planned, started, lateness_sec, duration_sec, ok}
+        self.sent = 0
+
+    def session(self, dt=None):
+        return _SESSION_OF.get(get_calendar().phase_at(dt or get_clock().now()), "closed")
+
+    # ---------- endpoint palsu ----------
+    def endpoint(self, name):
+        def fn(*args, **kw):
+            clock = get_clock()
+            by = self.requests.setdefault(self.session(), {})
+            by[name] = by.get(name, 0) + 1
+            clock.advance(self.latency)
+            now = clock.now()
+            secs = now.hour * 3600 + now.minute * 60 + now.second
+            if name in ("top_gainer", "top_value"):
+                opts = {"seed": secs // 120}  # ranking berubah tiap ~2 menit
+            elif name == "running_trade":
+                opts = {"n": kw.get("limit", 500), "seed": secs, "start_id": secs * 10}
+            else:
+                opts = {}
+            sym = args[0] if (name == "powerbuy" and args) else kw.get("symbol")
+            obj = fixtures.payload(name, hhmm=now.strftime("%H%M"), symbol=sym, root=self.root, **opts)
+            return json.dumps(obj).encode() if kw.get("raw") else obj
+        return fn
+
+    def send(self, text, *a, **kw):
+        self.sent += 1
+
+    # ---------- bungkus scheduler ----------
+    def wrap_snapshot(self, orig):
+        def run_snapshot(*a, **kw):
+            clock = get_clock()
+            start = clock.now()
+            t0 = clock.monotonic()
+            # sama dengan metrik tick_lateness_seconds: mulai snapshot vs jadwal market_loop
+            late = market_loop.tick_lateness(start)
+            ok = True
+            try:
+                return orig(*a, **kw)
+            except Exception:
+                ok = False
+                raise
+            finally:
+                self.ticks.append({
+                    "session": self.session(start),
+                    "planned": market_loop._planned.strftime("%H:%M:%S") if market_loop._planned else None,
+                    "started": start.strftime("%H:%M:%S"),
+                    "lateness_sec": round(late, 3),
+                    "duration_sec": round(clock.monotonic() - t0, 3),
+                    "ok": ok,
+                })
+        return run_snapshot
+
+    def summary(self):
+        out = {}
+        for sess in sorted({t["session"] for t in self.ticks} | set(self.requests)):
+            ts = [t for t in self.ticks if t["session"] == sess]
+            late = [t["lateness_sec"] for t in ts]
+            dur = [t["duration_sec"] for t in ts]
+            out[sess] = {
+                "ticks": len(ts),
+                "errors": sum(1 for t in ts if not t["ok"]),
+                "lateness_max": max(late) if late else None,
+                "lateness_p95": _pct(late, 0.95),
+                "duration_p50": _pct(dur, 0.50),
+                "duration_p95": _pct(dur, 0.95),
+                "requests": self.requests.get(sess, {}),
+                "requests_total": sum(self.requests.get(sess, {}).values()),
+            }
+        return out
+
+def replay(day, speed=None, latency_ms=0.0, root=fixtures.FIXTURE_DIR, start=dtime(8, 55)):
+    rec = Recorder(latency_ms=latency_ms, root=root)
+    prev_clock = set_clock(VirtualClock(TZ.localize(datetime.combine(day, start)), speed=speed))
+    saved = {}
+    patches = [(stockbit, n, rec.endpoint(n)) for n in ("top_gainer", "top_value", "running_trade", "powerbuy")]
+    patches += [(snap_once, "tg_send", rec.send), (market_loop, "tg_send", rec.send),
+                (snap_once, "PRICES_DIR", OUT_DIR / "prices"),
+                (snap_once, "RT_RING", RingReader(OUT_DIR / "rt_ring.bin")),  # tanpa producer → fetch API
+                (market_loop.CKPT, "path", OUT_DIR / "market_loop.ckpt"),
+                (market_loop, "run_snapshot", rec.wrap_snapshot(market_loop.run_snapshot))]
+    for mod, name, fn in patches:
+        saved[(mod, name)] = getattr(mod, name, None)
+        setattr(mod, name, fn)
+    market_loop.CKPT.path.unlink(missing_ok=True)  # replay selalu mulai dingin
+    snap_once.DAY_PRICES.update(day=None, prices={}, dirty=False, next=0.0)
+    wall0 = time.monotonic()
+    try:
+        market_loop.main()
+    finally:
+        snap_once.flush_prices()   # masih ke OUT_DIR/prices, sebelum PRICES_DIR dipulihkan
+        for (mod, name), fn in saved.items():
+            setattr(mod, name, fn)
+        set_clock(prev_clock)
+    return {
+        "date": day.isoformat(),
+        "speed": speed or "instant",
+        "latency_ms": latency_ms,
+        "wall_sec": round(time.monotonic() - wall0, 3),
+        "messages_sent": rec.sent,
+        "sessions": rec.summary(),
+        "ticks": rec.ticks,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay satu hari bursa dengan waktu virtual")
+    ap.add_argument("--date", help="YYYY-MM-DD (default: hari bursa terakhir)")
+    ap.add_argument("--speed", type=float, default=0, help="0 = instan; 100 = 100x waktu nyata")
+    ap.add_argument("--latency-ms", type=float, default=0, help="latensi simulasi per request")
+    ap.add_argument("--fixtures", default=str(fixtures.FIXTURE_DIR))
+    ap.add_argument("--out", help="file JSON hasil (default data/replay/<date>.json)")
+    args = ap.parse_args()
+
+    cal = get_calendar()
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date \
+        else cal.previous_trading_days(1, datetime.now(TZ).date())[0]
+    res = replay(day, speed=args.speed or None, latency_ms=args.latency_ms, root=Path(args.fixtures))
+
+    out = Path(args.out) if args.out else OUT_DIR / f"{day.isoformat()}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"[REPLAY] {res['date']} selesai dalam {res['wall_sec']}s nyata, pesan={res['messages_sent']}")
+    for sess, m in res["sessions"].items():
+        print(f"  {sess:<9} ticks={m['ticks']:<3} late_max={m['lateness_max']}s "
+              f"dur_p95={m['duration_p95']}s req={m['requests_total']} {m['requests']}")
+    print(f"[REPLAY] detail → {out}")
+
+if __name__ == "__main__":
+    main()
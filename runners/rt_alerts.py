@@ -1,31 +1,173 @@
 # runners/rt_alerts.py (cuplikan)
-import time
-from datetime import datetime, timedelta
 from clients import stockbit
-from auth.stockbit_login import get_bearer_token
+from auth.stockbit_login import get_bearer_token, BrowserUnavailable
+from notif.telegram import send as tg_send
+from logic.trading_calendar import get_calendar, ACTIVE_PHASES
+from logic.cadence import get_cadence
+from logic.config import fetch_settings
+from logic.clock import get_clock
+from logic import metrics
+from logic.profiling import LoopProfiler
+from logic.bounded import SessionState, MemoryGuard
+from logic.rt_ring import RingWriter
+from logic.checkpoint import Checkpoint
+from logic.parsers import coerce_dict
+from logic.parse_pool import get_pool, rt_trades_from_bytes
+
+CAL = get_calendar()
+CADENCE = get_cadence("running_trade")
+PROF = LoopProfiler("rt_alerts")
+
+
+# producer tape RT untuk konsumen lain di host yang sama (snap_once, dll.)
+RING = None
+
+# key trade poll terakhir (dedup antar poll) — ikut checkpoint supaya restart tak menghitung ulang
+SEEN = set()
+
+# state intraday: di-reset tiap hari bursa baru, dijaga RSS-nya
+STATE = SessionState()
+STATE.register("seen", SEEN, scope="day")
+MEM = MemoryGuard(STATE)
+
+def _dump_seen():
+    # key tuple (tanpa id trade) → list supaya bisa di-JSON-kan
+    return [list(k) if isinstance(k, tuple) else k for k in SEEN]
+
+def _load_seen(keys):
+    SEEN.clear()
+    SEEN.update(tuple(k) if isinstance(k, list) else k for k in keys)
+
+CKPT = Checkpoint("rt_alerts")
+CKPT.register("cadence", CADENCE.dump_state, CADENCE.load_state)
+CKPT.register("seen", _dump_seen, _load_seen)
+
+def now_id():
+    return get_clock().now()
+
+def _within_trading_window():
+    """Hari bursa dan belum lewat pre-closing (jeda istirahat tetap dihitung di dalam)."""
+    n = now_id()
+    bounds = CAL.session_bounds(n.date(), "preclose")
+    return bounds is not None and n < bounds[1]
+
+def _wait_if_closed():
+    """Di luar fase aktif (pre-open/istirahat) → tidur sampai fase aktif berikutnya. True bila sempat tidur."""
+    n = now_id()
+    if CAL.is_open(n, phases=ACTIVE_PHASES):
+        return False
+    nxt = CAL.next_session_start(n, phases=ACTIVE_PHASES)
+    if nxt and nxt.date() == n.date():
+        get_clock().sleep(max(0.0, (nxt - n).total_seconds()))
+        return True
+    return False
+
+def _trade_key(t):
+    tid = t.get("id") or t.get("trade_number") or t.get("trade_id")
+    if tid:
+        return tid
+    return (t.get("time") or t.get("trade_time"), t.get("code") or t.get("symbol"), t.get("price"), t.get("lot"))
+
+def _new_trades(trades, seen):
+    """Trade yang belum terlihat di poll sebelumnya; seen diganti isi poll ini (ukuran = 1 poll)."""
+    keys, new = set(), []
+    for raw in trades:
+        t = coerce_dict(raw)
+        if not t:
+            continue
+        k = _trade_key(t)
+        keys.add(k)
+        if k not in seen:
+            new.append(t)
+    seen.clear(); seen.update(keys)
+    return new
+
+def _stop_no_browser(e):
+    """Bearer ditolak dan host tanpa browser (job token-only) → alert sekali, loop berhenti bersih."""
+    tg_send(f"[RT ALERT] token ditolak dan login ulang tidak bisa di host ini ({e}); rt_alerts berhenti.")
+
+def _collect(pending, seen, last_poll):
+    """Ambil hasil parse satu poll: dedup, publish ke ring, laju trade ke cadence. Return waktu poll itu."""
+    fut, polled_at = pending
+    new = _new_trades(fut.result(), seen)
+    RING.publish(new)
+    if last_poll is not None and polled_at is not None:
+        CADENCE.observe_trades(len(new), polled_at - last_poll)
+    # ... proses & kirim telegram ...
+    return polled_at
 
 def run_loop():
-    while _within_trading_window():  # fungsi window-mu
+    if not CAL.is_trading_day(now_id().date()):
+        print("[RT ALERT] bukan hari bursa; selesai.")
+        return
+    global RING
+    RING = RingWriter()
+    CKPT.restore()
+    seen = SEEN
+    last_poll = None
+    pending = None   # (future parse, waktu poll): dikerjakan pool selama loop tidur, diambil iterasi berikutnya
+    while _within_trading_window():
+        STATE.check(now_id())
+        MEM.check()
+        if _wait_if_closed():
+            last_poll = None
+            if pending is not None:
+                pending = (pending[0], None)   # poll sebelum jeda: trade tetap diproses, tanpa laju
+            continue
         try:
-            data = stockbit.running_trade(limit=100)
-            # ... proses & kirim telegram ...
+            with PROF.iteration():
+                if pending is not None:
+                    pending, prev = None, pending
+                    last_poll = _collect(prev, seen, last_poll)
+                raw = stockbit.running_trade(limit=fetch_settings().rt_poll_limit, raw=True)
+                # decode + parse di logic.parse_pool (PARSE_POOL=thread/process): berjalan selama loop tidur,
+                # hasilnya diambil awal iterasi berikutnya. Mode off / sudah selesai → langsung diproses.
+                pending = (get_pool().submit(rt_trades_from_bytes, raw), get_clock().monotonic())
+                if pending[0].done():
+                    pending, cur = None, pending
+                    last_poll = _collect(cur, seen, last_poll)
+                CADENCE.observe_result(ok=True)
+        except BrowserUnavailable as e:
+            _stop_no_browser(e)
+            break
         except RuntimeError as e:
             s = str(e)
-            if "UNAUTHORIZED" in s or "401" in s or "403" in s:
+            CADENCE.observe_result(ok=False, throttled=stockbit.is_throttled(e))
+            if stockbit.http_status(e) in (401, 403) or "UNAUTHORIZED" in s:
                 print("[RT ALERT] Unauthorized, refreshing token...")
                 try:
                     get_bearer_token(force_refresh=True)
+                except BrowserUnavailable as ee:
+                    _stop_no_browser(ee)
+                    break
                 except Exception as ee:
                     print("[RT ALERT] Refresh failed:", ee)
-                time.sleep(2)
+                get_clock().sleep(2)
                 continue   # coba lagi
             else:
                 print("[RT ALERT] error:", s)
                 # jangan mati—tunda sebentar lalu lanjut
-                time.sleep(3)
+                get_clock().sleep(3)
                 continue
+        except Exception as e:
+            # decode di parse pool, Timeout/requests dari hedged GET, deadline stage, dll.
+            # jangan mati juga: loop berhenti = producer ring berhenti → snapshot diam-diam kembali ke API
+            CADENCE.observe_result(ok=False)
+            metrics.inc("rt_poll_errors", kind=type(e).__name__)
+            print(f"[RT ALERT] error ({type(e).__name__}):", e)
+            get_clock().sleep(3)
+            continue
 
-        time.sleep(2)  # jeda polling 2 detik (atau sesuai kebutuhan)
+        CKPT.maybe_save()
+        get_clock().sleep(CADENCE.next_interval(now_id()))  # ramai → min_sec, sepi → max_sec
+
+    if pending is not None:
+        try:
+            _collect(pending, seen, last_poll)
+        except Exception as e:
+            print("[RT ALERT] parse poll terakhir gagal:", e)
+    CKPT.maybe_save(force=True)
+    print("[RT ALERT] metrics summary →", metrics.write_summary("rt_alerts"))
 
 if __name__ == "__main__":
     run_loop()
@@ -1,16 +1,27 @@
-import time, json
-from datetime import datetime
-import pytz
+import atexit, hashlib, json, time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
 
 from clients import stockbit
-from logic.rolling import parse_market_mover, rupiah
+from logic.rolling import rupiah
 from notif.telegram import send as tg_send
-
-TZ = pytz.timezone("Asia/Jakarta")
+from notif.subscribers import load_subscribers, group_by_view, SECTIONS
+from logic.trading_calendar import get_calendar
+from logic.clock import get_clock
+from logic import metrics
+from logic.config import fetch_settings, load_config
+from logic import deadline
+from logic.deadline import Deadline
+from logic.parse_pool import get_pool, mover_from_bytes, rt_agg_from_bytes, pb_total_from_bytes
+# parser dipindah ke logic.parsers (ringan, dipakai worker pool); nama lama tetap untuk pemanggil lain
+from logic.parsers import (coerce_dict as _coerce_dict, extract_rt_list as _extract_rt_list,
+                           aggregate_rt as _aggregate_rt, tape_span as _tape_span,
+                           extract_pb_rows as _extract_pb_rows, pb_total as _pb_total)
+from logic.rt_ring import RingReader, aggregate_records
 
 # ================== Helpers ==================
 def now_id():
-    return datetime.now(TZ).strftime("%Y-%m-%d %H:%M:%S")
+    return get_clock().now().strftime("%Y-%m-%d %H:%M:%S")
 
 def id_int(n):
     """Integer → '1.234.567' (titik ribuan, gaya ID)."""
@@ -25,210 +36,365 @@ def pct(x):
     except Exception:
         return str(x)
 
-def _coerce_dict(x):
-    if isinstance(x, dict):
-        return x
-    if isinstance(x, str):
-        try:
-            j = json.loads(x)
-            return j if isinstance(j, dict) else None
-        except Exception:
-            return None
-    return None
-
-def _extract_rt_list(rt_raw):
-    """Support struktur baru: {'data': {'running_trade': [...]}} + fallback lama."""
-    if isinstance(rt_raw, dict):
-        d = rt_raw.get("data")
-        if isinstance(d, dict) and isinstance(d.get("running_trade"), list):
-            return d["running_trade"]
-        for key in ("data", "result", "items"):
-            v = rt_raw.get(key)
-            if isinstance(v, list):
-                return v
-            if isinstance(v, dict) and isinstance(v.get("items"), list):
-                return v["items"]
-        return []
-    if isinstance(rt_raw, list):
-        return rt_raw
-    return []
-
-def _to_num(s):
-    """Konversi string angka (punya koma/titik/persen/dash) → int aman."""
-    if s is None: return 0
-    if isinstance(s, (int, float)): return int(s)
-    s = str(s).strip()
-    if s in ("", "-", "—"): return 0
-    s = s.replace(",", "").replace(".", "").replace("%", "")
+def _powerbuy_one(sym, pb_interval):
     try:
-        return int(float(s))
+        raw = stockbit.powerbuy(sym, interval=pb_interval, raw=True)
+        fut = get_pool().submit(pb_total_from_bytes, raw, sym)   # mode thread/process: parse selama jeda
+        get_clock().sleep(0.10)
+        return fut.result()
     except Exception:
-        return 0
+        return None
 
-# ================== Main ==================
-def run(top_n=10, include_powerbuy=True, pb_limit=20, rt_limit=500, pb_interval="10m"):
-    # --- TOP GAINER / VALUE (ambil bahan)
-    gainers_raw = stockbit.top_gainer()
-    values_raw  = stockbit.top_value()
-
-    # Top Gainer cukup langsung 10 teratas
-    gainers = parse_market_mover(gainers_raw)[:top_n]
-
-    # Top Value: ambil lebih banyak dulu, lalu filter yang naik, baru ambil 10
-    values_all = parse_market_mover(values_raw)[:50]  # bahan lebih banyak
-    values_pos = [v for v in values_all if (v.get("chg_pct") or 0) > 0][:top_n]
-
-    # --- RUNNING TRADE
-    rt_raw  = stockbit.running_trade(limit=rt_limit)
-    rt_list = _extract_rt_list(rt_raw)
-
-    # --- Aggregate RT per simbol (untuk seksi RT Most Active)
-    agg = {}
-    skipped = 0
-    for raw in rt_list:
-        t = _coerce_dict(raw)
-        if not t:
-            skipped += 1
-            continue
-        s = t.get("symbol") or t.get("stock") or t.get("code")
-        if not s:
-            skipped += 1
-            continue
-        try:
-            price = int(float(t.get("price") or t.get("trade_price") or t.get("last") or 0))
-        except Exception:
-            price = 0
-        try:
-            lot = int(float(t.get("lot") or t.get("volume") or 0))
-        except Exception:
-            lot = 0
+def _powerbuy_totals(symbols, pb_interval, workers=1, stop_at=None):
+    """
+    workers > 1 → request PowerBuy paralel (fan-out diatur powerbuy.workers per jendela waktu).
+    stop_at (monotonic) → simbol yang belum selesai saat itu dilewati.
+    Return (totals, jumlah simbol terlewat).
+    """
+    results, skipped = [], 0
+    if workers > 1 and len(symbols) > 1:
+        ex = ThreadPoolExecutor(max_workers=min(workers, len(symbols)), thread_name_prefix="pb")
+        end = stop_at or deadline.current_end()
+        futs = [ex.submit(deadline.run_bound, end, _powerbuy_one, s, pb_interval) for s in symbols]
+        done, pending = wait(futs, timeout=None if stop_at is None else max(0.0, stop_at - time.monotonic()))
+        results = [f.result() for f in futs if f in done]
+        skipped = len(pending)
+        ex.shutdown(wait=False, cancel_futures=True)  # yang tertinggal berhenti sendiri di batas stage
+    else:
+        for i, sym in enumerate(symbols):
+            if stop_at is not None and time.monotonic() >= stop_at:
+                skipped = len(symbols) - i
+                break
+            results.append(_powerbuy_one(sym, pb_interval))
+    totals = [r for r in results if r]
+    # Urutkan berdasar TOTAL BUY LOT terbesar
+    totals.sort(key=lambda r: r["buy_lot"], reverse=True)
+    return totals, skipped
+
+PRICES_DIR = Path("data/prices")
+# harga hari ini di memori; file ditulis lewat flush_prices (throttle prices.flush_sec, akhir sesi, exit)
+DAY_PRICES = {"day": None, "prices": {}, "dirty": False, "next": 0.0}
+
+def _record_prices(rows):
+    day = get_clock().now().date().isoformat()
+    if DAY_PRICES["day"] != day:
+        flush_prices()   # sisa hari sebelumnya
+        DAY_PRICES.update(day=day, prices={}, dirty=False)
+    prices = DAY_PRICES["prices"]
+    for r in rows:
         try:
-            val = int(float(t.get("value") or (price * lot * 100)))
-        except Exception:
-            val = price * lot * 100
-
-        cur = agg.get(s, {"value":0,"lot":0,"price":price})
-        cur["value"] += max(0, val)
-        cur["lot"]   += max(0, lot)
-        if price:
-            cur["price"] = price
-        agg[s] = cur
-
-    # ====== Compose report ======
-    lines = []
-    lines.append(f"📊 Stockbit Snapshot {now_id()}")
-    lines.append(f"(info: gainers={len(gainers)}, values_pos={len(values_pos)}, rt_items={len(rt_list)}, rt_skipped={skipped})")
-    lines.append("")
+            last = float(r.get("last"))
+        except (TypeError, ValueError):
+            continue
+        if last > 0:
+            prices[r["symbol"]] = last
+            DAY_PRICES["dirty"] = True
+    if DAY_PRICES["dirty"] and get_clock().monotonic() >= DAY_PRICES["next"]:
+        flush_prices()
 
-    # --- TABEL: Top Gainer (symbol · % up · last · value)
-    lines.append("— Top Gainer —")
-    if not gainers:
-        lines.append("  (kosong)")
-    else:
-        lines.append("  Symbol  |   % Up   |  Last  |        Value")
-        lines.append("  --------+----------+--------+----------------")
-        for g in gainers:
-            sym  = g["symbol"]
-            chg  = pct(g["chg_pct"] if g["chg_pct"] is not None else 0)
-            last = id_int(g.get("last") or 0) if (g.get("last") is not None) else "-"
-            val  = rupiah(g["value"] if g["value"] is not None else 0)
-            lines.append(f"  {sym:<7} | {chg:>8} | {last:>6} | {val:>14}")
-    lines.append("")
+def flush_prices():
+    """Tulis harga hari ini ke data/prices/<tanggal>.json (digabung dengan isi file) bila ada yang baru."""
+    if not DAY_PRICES["dirty"]:
+        return None
+    PRICES_DIR.mkdir(parents=True, exist_ok=True)
+    path = PRICES_DIR / f"{DAY_PRICES['day']}.json"
+    try:
+        cur = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        cur = {}
+    cur.update(DAY_PRICES["prices"])
+    path.write_text(json.dumps(cur, separators=(",", ":")), encoding="utf-8")
+    flush_sec = float((load_config().get("prices") or {}).get("flush_sec", 600))
+    DAY_PRICES["dirty"], DAY_PRICES["next"] = False, get_clock().monotonic() + flush_sec
+    return path
 
-    # --- TABEL: Top Value (HANYA yang naik) (symbol · % up · last · value)
-    lines.append("— Top Value (Up Only) —")
-    if not values_pos:
-        lines.append("  (tidak ada saham naik di Top Value)")
-    else:
-        lines.append("  Symbol  |   % Up   |  Last  |        Value")
-        lines.append("  --------+----------+--------+----------------")
-        for v in values_pos:
-            sym  = v["symbol"]
-            chg  = pct(v["chg_pct"] if v["chg_pct"] is not None else 0)
-            last = id_int(v.get("last") or 0) if (v.get("last") is not None) else "-"
-            val  = rupiah(v["value"] if v["value"] is not None else 0)
-            lines.append(f"  {sym:<7} | {chg:>8} | {last:>6} | {val:>14}")
-    lines.append("")
+def _flush_prices_at_exit():
+    try:
+        flush_prices()
+    except Exception as e:
+        print("[SNAP] gagal simpan harga:", e)
+
+# snapshot one-shot / loop yang berhenti tetap menyimpan harga terakhir
+atexit.register(_flush_prices_at_exit)
+
+# ================== Collect (sekali per snapshot) ==================
+def _fetch_parse(span_name, fetch, parse):
+    """
+    Dijalankan sebagai stage (thread): fetch bytes lalu parse di pool dan MENUNGGU hasilnya.
+    Tidak ada kerja lain di thread ini; mode process hanya melepas CPU parsing dari GIL stage lain.
+    """
+    with metrics.span(span_name):
+        raw = fetch()
+    return get_pool().submit(parse, raw).result()
+
+RT_RING = RingReader()
+
+# state antar snapshot (ikut checkpoint market_loop → warm restart tanpa kirim ulang / fetch ulang)
+LAST_SENT = {}                          # view → (hash isi laporan, epoch kirim)
+LAST_POWERBUY = {"day": None, "rows": {}}  # total PowerBuy terakhir per simbol (hari ini)
+
+def _view_dump(view):
+    """Kunci tampilan → bentuk JSON: "default" atau [sections, watchlist urut]."""
+    return view if isinstance(view, str) else [list(view[0]), sorted(view[1])]
+
+def _view_load(v):
+    return v if isinstance(v, str) else (tuple(v[0]), frozenset(v[1]))
+
+def checkpoint_state():
+    return {"last_sent": [[_view_dump(v), h, t] for v, (h, t) in LAST_SENT.items()], "powerbuy": LAST_POWERBUY}
+
+def restore_state(d):
+    for v, h, t in d.get("last_sent") or []:
+        LAST_SENT[_view_load(v)] = (h, t)
+    pb = d.get("powerbuy") or {}
+    LAST_POWERBUY["day"] = pb.get("day")
+    LAST_POWERBUY["rows"].clear()
+    LAST_POWERBUY["rows"].update(pb.get("rows") or {})
 
-    # --- TABEL: RT Most Active (by value)
-    lines.append("— RT Most Active (last window) —")
-    if not agg:
-        lines.append("  (tidak ada data RT)")
+def register_state(state):
+    """Daftarkan state antar snapshot ke logic.bounded.SessionState (reset harian + MemoryGuard)."""
+    state.register("last_sent", LAST_SENT, scope="day")
+    state.register("last_powerbuy", LAST_POWERBUY["rows"], scope="day")
+    return state
+
+def _merge_powerbuy(fresh, candidates, partial):
+    """Simpan total terbaru; bila stage PowerBuy parsial, simbol yang terlewat diisi total tick sebelumnya."""
+    day = get_clock().now().date().isoformat()
+    rows = LAST_POWERBUY["rows"]   # objek yang sama selamanya (terdaftar di SessionState live_loop)
+    if LAST_POWERBUY["day"] != day:
+        LAST_POWERBUY["day"] = day
+        rows.clear()
+    got = set()
+    for r in fresh:
+        rows[r["symbol"]] = r
+        got.add(r["symbol"])
+    if not partial:
+        return fresh
+    stale = [rows[s] for s in candidates if s not in got and s in rows]
+    return sorted(fresh + stale, key=lambda r: r["buy_lot"], reverse=True)
+
+def collect(top_n=None, include_powerbuy=None, pb_limit=None, rt_limit=None, pb_interval=None,
+            settings=None):
+    """
+    Ambil semua bahan laporan sekali → data model bersama untuk semua subscriber.
+    Argumen None → dari config (logic.config.fetch_settings: ukuran fetch per jendela waktu).
+    """
+    cfg = settings or fetch_settings()
+    top_n = cfg.top_n if top_n is None else top_n
+    include_powerbuy = cfg.include_powerbuy if include_powerbuy is None else include_powerbuy
+    pb_limit = cfg.pb_limit if pb_limit is None else pb_limit
+    rt_limit = cfg.rt_limit if rt_limit is None else rt_limit
+    pb_interval = pb_interval or cfg.pb_interval
+    # Batas waktu total + per stage (logic.deadline): stage terlambat → bagian laporan dilewati (parsial)
+    dl = Deadline.for_snapshot()
+
+    # --- TOP GAINER / VALUE (ambil bahan), paralel; bytes mentah → parsing di pool (logic.parse_pool)
+    f_gainers = dl.submit("movers", _fetch_parse, "fetch_gainers",
+                          lambda: stockbit.top_gainer(raw=True), mover_from_bytes)
+    f_values = dl.submit("movers", _fetch_parse, "fetch_values",
+                         lambda: stockbit.top_value(raw=True), mover_from_bytes)
+    # rt_alerts di host yang sama mempublikasikan tape ke ring mmap → tak perlu unduh ulang
+    if RT_RING.fresh():
+        with metrics.span("fetch_rt"):
+            recs = RT_RING.tail(rt_limit)
+        f_rt = None
+        metrics.inc("rt_source", source="ring")
     else:
-        lines.append("  Symbol  |  Last  |   Lot   |     Value")
-        lines.append("  --------+--------+---------+----------------")
-        top_rt = sorted(agg.items(), key=lambda kv: kv[1]["value"], reverse=True)[:10]
-        for sym, m in top_rt:
-            last = id_int(m.get("price", 0)) if m.get("price") else "-"
-            lot  = id_int(m.get("lot", 0))
-            val  = rupiah(m.get("value", 0))
-            lines.append(f"  {sym:<7} | {last:>6} | {lot:>7} | {val:>14}")
-    lines.append("")
+        f_rt = dl.submit("running_trade", _fetch_parse, "fetch_rt",
+                         lambda: stockbit.running_trade(limit=rt_limit, raw=True), rt_agg_from_bytes)
+        metrics.inc("rt_source", source="api")
 
-    # --- TABEL: PowerBuy Top Buyers (Total Hari Ini, sum semua bucket 10m)
-    if include_powerbuy:
-        lines.append(f"— PowerBuy Top Buyers (Total Hari Ini, {pb_interval}) —")
+    with metrics.span("aggregate"):
+        # Top Gainer cukup langsung 10 teratas
+        gainers_all = dl.result(f_gainers, default=[])
+        gainers = gainers_all[:top_n]
+
+        # Top Value: ambil lebih banyak dulu, lalu filter yang naik, baru ambil 10
+        values_full = dl.result(f_values, default=[])
+        if len(dl.errors) == 2:
+            raise dl.errors[0][1]  # dua-duanya gagal (token mati, API down) → laporan tak bermakna
+        values_all = values_full[:cfg.value_pool]  # bahan lebih banyak
+        values_pos = [v for v in values_all if (v.get("chg_pct") or 0) > 0][:top_n]
+
+        # --- RUNNING TRADE
+        if f_rt is None:
+            agg, n_rt, skipped = aggregate_records(recs), len(recs), 0
+            # ts record = jam trade di bursa (sama dengan tape_span jalur API), bukan waktu publish
+            rt_span = max(r[1] for r in recs) - min(r[1] for r in recs) if recs else 0
+        else:
+            agg, n_rt, skipped, rt_span = dl.result(f_rt, default=({}, 0, 0, 0))
+        rt_top = sorted(agg.items(), key=lambda kv: kv[1]["value"], reverse=True)
+
+    # harga terakhir per simbol → data/prices/<tanggal>.json (bahan backtest; snapshot terakhir ≈ close)
+    try:
+        _record_prices(gainers_all + values_full)
+    except Exception as e:
+        print("[SNAP] gagal simpan harga:", e)
 
-        # kandidat simbol: dari Top Gainer + Top Value (yang naik)
+    # --- POWERBUY: kandidat simbol dari Top Gainer + Top Value (yang naik)
+    powerbuy = None
+    if include_powerbuy:
         uniq = []
         for x in gainers + values_pos:
             s = x["symbol"]
             if s and s not in uniq:
                 uniq.append(s)
+        with metrics.span("fetch_powerbuy"), dl.stage("powerbuy") as stop_at:
+            powerbuy, pb_skipped = _powerbuy_totals(uniq[:pb_limit], pb_interval,
+                                                    workers=cfg.pb_workers, stop_at=stop_at)
+        if pb_skipped:
+            dl.miss("powerbuy")
+        powerbuy = _merge_powerbuy(powerbuy, uniq[:pb_limit], partial=bool(pb_skipped))
 
-        def _extract_pb_rows(pb_obj):
-            if not isinstance(pb_obj, dict): return []
-            d = pb_obj.get("data")
-            if isinstance(d, dict) and isinstance(d.get("book"), list):   # struktur terbaru
-                return d["book"]
-            # fallback kemungkinan lama
-            if isinstance(d, dict) and isinstance(d.get("intervals"), list):
-                return d["intervals"]
-            if isinstance(d, dict) and isinstance(d.get("items"), list):
-                return d["items"]
-            return []
-
-        totals = []
-        for sym in uniq[:pb_limit]:
-            try:
-                pb = stockbit.powerbuy(sym, interval=pb_interval)
-                rows = _extract_pb_rows(pb)
-                if not rows:
-                    continue
-                tot_buy = tot_sell = 0
-                for r in rows:
-                    buy  = (r.get("buy")  or {})
-                    sell = (r.get("sell") or {})
-                    tot_buy  += _to_num(buy.get("lot"))
-                    tot_sell += _to_num(sell.get("lot"))
-                total_lot = tot_buy + tot_sell
-                totals.append({
-                    "symbol": sym,
-                    "buy_lot": tot_buy,
-                    "sell_lot": tot_sell,
-                    "total_lot": total_lot,
-                    "buy_ratio": (tot_buy / total_lot) if total_lot > 0 else None
-                })
-                time.sleep(0.10)
-            except Exception:
-                pass
-
-        if not totals:
-            lines.append("  (tidak ada data)")
-        else:
-            # Urutkan berdasar TOTAL BUY LOT terbesar
-            totals.sort(key=lambda r: r["buy_lot"], reverse=True)
-            lines.append("  Symbol  |  Buy%  |   Total Buy   |  Total Sell  |  Total Lot")
-            lines.append("  --------+--------+---------------+--------------+------------")
-            for r in totals[:10]:
-                br = ("{:5.1f}%".format(r["buy_ratio"]*100) if r["buy_ratio"] is not None else "  n/a")
-                bl = id_int(r["buy_lot"])
-                sl = id_int(r["sell_lot"])
-                tl = id_int(r["total_lot"])
-                lines.append(f"  {r['symbol']:<7} | {br:>6} | {bl:>13} | {sl:>12} | {tl:>10}")
-
-    # Kirim / print
-    tg_send("\n".join(lines))
+    if dl.missed:
+        metrics.inc("snapshot_partial")
+    return {
+        "ts": now_id(),
+        "partial": list(dl.missed),
+        "errors": [f"{stage}: {e}" for stage, e in dl.errors],
+        "throttled": any(stockbit.is_throttled(e) for _, e in dl.errors),
+        "gainers": gainers,
+        "values_pos": values_pos,
+        "rt_top": rt_top,
+        "rt_items": n_rt,
+        "rt_skipped": skipped,
+        "rt_span_sec": rt_span,   # rentang waktu tape → laju trade untuk cadence market_loop
+        "powerbuy": powerbuy,
+        "pb_interval": pb_interval,
+    }
+
+# ================== Render (per tampilan) ==================
+def _mover_table(rows, empty):
+    out = []
+    if not rows:
+        out.append(empty)
+        return out
+    out.append("  Symbol  |   % Up   |  Last  |        Value")
+    out.append("  --------+----------+--------+----------------")
+    for g in rows:
+        sym  = g["symbol"]
+        chg  = pct(g["chg_pct"] if g["chg_pct"] is not None else 0)
+        last = id_int(g.get("last") or 0) if (g.get("last") is not None) else "-"
+        val  = rupiah(g["value"] if g["value"] is not None else 0)
+        out.append(f"  {sym:<7} | {chg:>8} | {last:>6} | {val:>14}")
+    return out
+
+def _late(model, stage):
+    """Teks pengganti bila stage melewati deadline (laporan parsial)."""
+    return "  (terlambat — dilewati tick ini)" if stage in (model.get("partial") or ()) else None
+
+def _section_gainer(model, keep):
+    rows = [g for g in model["gainers"] if keep(g["symbol"])]
+    return ["— Top Gainer —"] + _mover_table(rows, _late(model, "movers") or "  (kosong)")
+
+def _section_value(model, keep):
+    rows = [v for v in model["values_pos"] if keep(v["symbol"])]
+    return ["— Top Value (Up Only) —"] + _mover_table(
+        rows, _late(model, "movers") or "  (tidak ada saham naik di Top Value)")
+
+def _section_rt(model, keep):
+    out = ["— RT Most Active (last window) —"]
+    rows = [(s, m) for s, m in model["rt_top"] if keep(s)][:10]
+    if not rows:
+        out.append(_late(model, "running_trade") or "  (tidak ada data RT)")
+        return out
+    out.append("  Symbol  |  Last  |   Lot   |     Value")
+    out.append("  --------+--------+---------+----------------")
+    for sym, m in rows:
+        last = id_int(m.get("price", 0)) if m.get("price") else "-"
+        lot  = id_int(m.get("lot", 0))
+        val  = rupiah(m.get("value", 0))
+        out.append(f"  {sym:<7} | {last:>6} | {lot:>7} | {val:>14}")
+    return out
+
+def _section_powerbuy(model, keep):
+    # --- PowerBuy Top Buyers (Total Hari Ini, sum semua bucket 10m)
+    if model["powerbuy"] is None:
+        return []
+    out = [f"— PowerBuy Top Buyers (Total Hari Ini, {model['pb_interval']}) —"]
+    if "powerbuy" in (model.get("partial") or ()):
+        out[0] = out[0][:-1] + "(sebagian) —"
+    rows = [r for r in model["powerbuy"] if keep(r["symbol"])][:10]
+    if not rows:
+        out.append(_late(model, "powerbuy") or "  (tidak ada data)")
+        return out
+    out.append("  Symbol  |  Buy%  |   Total Buy   |  Total Sell  |  Total Lot")
+    out.append("  --------+--------+---------------+--------------+------------")
+    for r in rows:
+        br = ("{:5.1f}%".format(r["buy_ratio"]*100) if r["buy_ratio"] is not None else "  n/a")
+        bl = id_int(r["buy_lot"])
+        sl = id_int(r["sell_lot"])
+        tl = id_int(r["total_lot"])
+        out.append(f"  {r['symbol']:<7} | {br:>6} | {bl:>13} | {sl:>12} | {tl:>10}")
+    return out
+
+_SECTION_RENDER = {
+    "gainer": _section_gainer,
+    "value": _section_value,
+    "rt": _section_rt,
+    "powerbuy": _section_powerbuy,
+}
+
+def render(model, sections=SECTIONS, watchlist=frozenset()):
+    """Render satu tampilan dari data model (murah: hanya filter + format)."""
+    keep = (lambda s: s in watchlist) if watchlist else (lambda s: True)
+    lines = []
+    lines.append(f"📊 Stockbit Snapshot {model['ts']}")
+    if model.get("partial"):
+        lines.append(f"⚠️ PARSIAL — terlambat/dilewati: {', '.join(model['partial'])}")
+    lines.append(f"(info: gainers={len(model['gainers'])}, values_pos={len(model['values_pos'])}, rt_items={model['rt_items']}, rt_skipped={model['rt_skipped']})")
+    if watchlist:
+        lines.append(f"(watchlist: {', '.join(sorted(watchlist))})")
+    lines.append("")
+    for sec in sections:
+        body = _SECTION_RENDER[sec](model, keep)
+        if body:
+            lines.extend(body)
+            lines.append("")
+    return "\n".join(lines).rstrip("\n")
+
+def _send_once(view, text, **kw):
+    """
+    Kirim kecuali isi (tanpa baris timestamp) identik dengan kiriman terakhir tampilan ini
+    dalam checkpoint.dedupe_sec detik — mis. job pengganti yang baru pulih dari checkpoint.
+    """
+    h = hashlib.blake2b(text.split("\n", 1)[-1].encode(), digest_size=8).hexdigest()
+    now = get_clock().now().timestamp()
+    prev = LAST_SENT.get(view)
+    dedupe_sec = float((load_config().get("checkpoint") or {}).get("dedupe_sec", 60))
+    if prev and prev[0] == h and now - prev[1] < dedupe_sec:
+        metrics.inc("reports_deduped")
+        return False
+    tg_send(text, **kw)
+    LAST_SENT[view] = (h, now)
+    return True
+
+def deliver(model, subscribers=None):
+    """Fan-out: satu render per tampilan unik, dikirim ke semua chat yang memakainya."""
+    subs = subscribers if subscribers is not None else load_subscribers()
+    if not subs:
+        with metrics.span("render"):
+            text = render(model)
+        with metrics.span("send"):
+            _send_once("default", text)
+        return
+    for (sections, watchlist), chat_ids in group_by_view(subs).items():
+        with metrics.span("render"):
+            text = render(model, sections, watchlist)
+        with metrics.span("send"):
+            _send_once((sections, watchlist), text, chat_ids=chat_ids)
+
+# ================== Main ==================
+def run(top_n=None, include_powerbuy=None, pb_limit=None, rt_limit=None, pb_interval=None, subscribers=None):
+    with metrics.span("snapshot"):
+        model = collect(top_n=top_n, include_powerbuy=include_powerbuy, pb_limit=pb_limit,
+                        rt_limit=rt_limit, pb_interval=pb_interval)
+        # Kirim / print
+        deliver(model, subscribers)
+    return model
 
 if __name__ == "__main__":
-    run()
+    if get_calendar().is_trading_day(get_clock().now().date()):
+        run()
+    else:
+        print("[SNAP] bukan hari bursa; snapshot dilewati.")